@@ -1,5 +1,4 @@
-import math
-import os
+import io
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
@@ -7,63 +6,13 @@ from reportlab.lib.pagesizes import letter
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
-from typing import Dict, Tuple
+from typing import Dict
 
-
-# =======================
-# FUNÇÕES DE CÁLCULO DE MATERIAIS
-# =======================
-
-def calcular_area(largura: float, comprimento: float) -> float:
-    return largura * comprimento
-
-
-def calcular_perimetro(largura: float, comprimento: float) -> float:
-    return 2 * (largura + comprimento)
-
-
-def calcular_blocos(area: float) -> float:
-    return area * 12.5
-
-
-def calcular_tela(perimetro: float, profundidade: float) -> float:
-    return (perimetro + 4 * profundidade) / 5
-
-
-def calcular_impermeabilizante1(area: float) -> int:
-    return math.ceil(area / 9)
-
-
-def calcular_impermeabilizante2(area: float) -> int:
-    return math.ceil(area / 4)
-
-
-def calcular_cimento(area: float) -> float:
-    return (0.013 + 0.038 + 0.14) * area / 50
-
-
-def calcular_areia(area: float) -> float:
-    return (0.065 + 0.004 + 0.025) * area
-
-
-def calcular_ligmassa(area: float) -> float:
-    return (0.0026 + 0.05) * area
-
-
-def calcular_revestimento(area: float) -> float:
-    return area
-
-
-def calcular_argamassa(area: float) -> float:
-    return 0.45 * area
-
-
-def calcular_rejunte(area: float) -> float:
-    return 0.05 * area / 20
-
-
-def calcular_espacadores(area: float) -> float:
-    return 12 * area
+from calculos import calcular_projeto
+from catalogo import abrir_catalogo
+from paginacao import paginar_projeto
+from saidas import Trabalho, abrir_trabalho, limpar_trabalhos
+from utils import DPI_IMPRESSAO, adicionar_aba_graficos, figura_png
 
 
 # =======================
@@ -110,95 +59,18 @@ def coletar_dados_projeto() -> Dict[str, float]:
     return dados
 
 
-# =======================
-# CÁLCULOS PRINCIPAIS
-# =======================
-
-def calcular_tudo(
-    dados_piscina: Dict[str, float],
-    custo_unitario: Dict[str, float],
-    extras: Dict[str, float],
-    preco_agua_por_litro: float = 0.01,
-    caminhoes_enchimento: int = 3,
-    fluxo_mangueira_lph: float = 1000.0
-) -> Tuple[Dict[str, float], Dict[str, float], Dict[str, float], float]:
-    """
-    Calcula todos os materiais, custos e custos por fase.
-    
-    CORREÇÃO: Parâmetro renomeado de 'caminhos_enchimento' para 'caminhoes_enchimento'
-    para consistência com o uso posterior.
-    """
-    
-    largura = dados_piscina["Largura"]
-    comprimento = dados_piscina["Comprimento"]
-    profundidade = (dados_piscina["Profundidade_min"] + dados_piscina["Profundidade_max"]) / 2
-
-    area = calcular_area(largura, comprimento)
-    perimetro = calcular_perimetro(largura, comprimento)
-
-    materiais = {
-        "Blocos": calcular_blocos(area),
-        "Tela para Quina Vivas (caixas)": calcular_tela(perimetro, profundidade),
-        "Impermeabilizante1 (caixas 20kg)": calcular_impermeabilizante1(area),
-        "Impermeabilizante2 (caixas 20kg)": calcular_impermeabilizante2(area),
-        "Cimento (sacos)": calcular_cimento(area),
-        "Areia (m³)": calcular_areia(area),
-        "Ligmassa (litros)": calcular_ligmassa(area),
-        "Argamassa ACIII (kg)": calcular_argamassa(area),
-        "Rejunte Acrílico (sacos)": calcular_rejunte(area),
-        "Espaçadores (unidades)": calcular_espacadores(area)
-    }
-
-    if dados_piscina["Usar_revestimento"] == "Revestimento":
-        materiais["Revestimento (m²)"] = calcular_revestimento(area)
-
-    if dados_piscina["Vai_hidromassagem"] == "Sim":
-        materiais["Hidromassagem (kit)"] = 1
-
-    if dados_piscina["Tipo_piscina"] == "Vinilico":
-        area_manta = (area + perimetro * profundidade) * 1.10
-        materiais["Manta Vinilica (m²)"] = round(area_manta, 3)
-
-    # Enchimento da piscina
-    volume_m3 = largura * comprimento * profundidade
-    litros = volume_m3 * 1000
-    materiais["Volume de água (L)"] = round(litros, 2)
-    materiais["Caminhões de enchimento (unidades)"] = caminhoes_enchimento
-    tempo_horas = litros / (caminhoes_enchimento * fluxo_mangueira_lph)
-    materiais["Tempo estimado enchimento (h)"] = round(tempo_horas, 2)
-
-    custos = {m: materiais[m] * custo_unitario.get(m, 0) for m in materiais}
-    custos["Custo de enchimento (R$)"] = round(litros * preco_agua_por_litro, 2)
-
-    if "Hidromassagem (kit)" in materiais:
-        custos["Hidromassagem (kit)"] = extras.get("custo_hidromassagem_kit", 0)
-
-    fases = {
-        "Alvenaria": ["Blocos", "Cimento (sacos)"],
-        "Impermeabilização": ["Impermeabilizante1 (caixas 20kg)", "Impermeabilizante2 (caixas 20kg)"],
-        "Chapisco/Reboco": ["Cimento (sacos)", "Areia (m³)", "Argamassa ACIII (kg)"],
-        "Revestimento": ["Revestimento (m²)", "Argamassa ACIII (kg)"],
-        "Acabamento": ["Rejunte Acrílico (sacos)", "Espaçadores (unidades)"],
-        "Enchimento": ["Custo de enchimento (R$)"]
-    }
-    if "Hidromassagem (kit)" in materiais:
-        fases["Extras"] = ["Hidromassagem (kit)"]
-
-    custos_fase = {fase: sum(custos.get(m, 0) for m in mats) for fase, mats in fases.items()}
-    return materiais, custos, custos_fase, area
-
-
 # =======================
 # GRÁFICOS
 # =======================
 
-def gerar_graficos(materiais, custos, custos_fase, area):
+def gerar_graficos(materiais, custos, custos_fase, area, dpi=DPI_IMPRESSAO) -> Dict[str, io.BytesIO]:
     """
-    Gera gráficos de análise de materiais e custos.
+    Gera gráficos de análise de materiais e custos como PNGs em memória
+    ({nome: BytesIO}), embutidos depois no Excel e no PDF.
     """
     import seaborn as sns
     import numpy as np
-    os.makedirs("graficos", exist_ok=True)
+    graficos = {}
 
     # Paleta pastel suave
     cores = sns.color_palette("pastel")
@@ -223,8 +95,7 @@ def gerar_graficos(materiais, custos, custos_fase, area):
     plt.title("Quantidade de Materiais por m²", fontsize=13, fontweight="bold")
     plt.ylabel("Quantidade (escala logarítmica)")
     plt.tight_layout()
-    plt.savefig("graficos/quantidade_por_m2.png", dpi=200)
-    plt.close()
+    graficos["quantidade_por_m2"] = figura_png(plt.gcf(), dpi)
 
     # === Custos por fase ===
     plt.figure(figsize=(10,6))
@@ -232,8 +103,7 @@ def gerar_graficos(materiais, custos, custos_fase, area):
     plt.xlabel("Custo (R$)")
     plt.title("Distribuição de custos por fase", fontsize=13, fontweight="bold")
     plt.tight_layout()
-    plt.savefig("graficos/custos_por_fase.png", dpi=200)
-    plt.close()
+    graficos["custos_por_fase"] = figura_png(plt.gcf(), dpi)
 
     # === Custos por material ===
     plt.figure(figsize=(12,6))
@@ -242,8 +112,7 @@ def gerar_graficos(materiais, custos, custos_fase, area):
     plt.xlabel("Custo (R$)")
     plt.title("Custos por material (inclui enchimento da piscina)", fontsize=13, fontweight="bold")
     plt.tight_layout()
-    plt.savefig("graficos/custos_por_material.png", dpi=200)
-    plt.close()
+    graficos["custos_por_material"] = figura_png(plt.gcf(), dpi)
 
     # === Enchimento da Piscina ===
     # CORREÇÃO: Linha 234 - "Caminhos" alterado para "Caminhões"
@@ -266,35 +135,37 @@ def gerar_graficos(materiais, custos, custos_fase, area):
             ax.text(b.get_x() + b.get_width()/2, altura + (altura*0.02 if altura>0 else 0.1),
                     f"{valores[i]:,.2f}", ha="center", va="bottom", fontsize=10, color="#333")
         plt.tight_layout()
-        plt.savefig("graficos/custo_enchimento.png", dpi=200)
-        plt.close(fig)
+        graficos["custo_enchimento"] = figura_png(fig, dpi)
+
+    return graficos
 
 
 # =======================
 # RELATÓRIOS
 # =======================
 
-def salvar_excel(dados_piscina, materiais, custos, custos_fase):
+def salvar_excel(dados_piscina, materiais, custos, custos_fase, trabalho: Trabalho, graficos=None):
     """
     Salva relatório completo em formato Excel.
     """
     try:
-        with pd.ExcelWriter("relatorio_piscina.xlsx") as writer:
+        with trabalho.gravando("relatorio_piscina.xlsx") as temporario, pd.ExcelWriter(temporario) as writer:
             pd.DataFrame([dados_piscina]).to_excel(writer, sheet_name="Dados_Projeto", index=False)
             pd.DataFrame(list(materiais.items()), columns=["Material", "Quantidade"]).to_excel(writer, sheet_name="Materiais", index=False)
             pd.DataFrame(list(custos.items()), columns=["Material", "Custo (R$)"]).to_excel(writer, sheet_name="Custos", index=False)
             pd.DataFrame(list(custos_fase.items()), columns=["Fase", "Custo (R$)"]).to_excel(writer, sheet_name="Custos_Fase", index=False)
-        print("✅ Planilha Excel gerada: relatorio_piscina.xlsx")
+            if graficos:
+                adicionar_aba_graficos(writer.book, graficos)
+        print(f"✅ Planilha Excel gerada: {trabalho.caminho('relatorio_piscina.xlsx')}")
     except Exception as e:
         print(f"❌ Erro ao gerar Excel: {e}")
 
 
-def gerar_pdf(dados_piscina, materiais, custos, custos_fase):
+def gerar_pdf(dados_piscina, materiais, custos, custos_fase, trabalho: Trabalho, graficos=None):
     """
     Gera relatório em PDF com gráficos incorporados.
     """
     try:
-        doc = SimpleDocTemplate("orcamento_piscina.pdf", pagesize=letter)
         styles = getSampleStyleSheet()
         story = []
 
@@ -322,17 +193,16 @@ def gerar_pdf(dados_piscina, materiais, custos, custos_fase):
             add_section("Informações de Enchimento", enchimento_data)
 
         # Adiciona gráficos
-        for img_name in sorted(os.listdir("graficos")):
-            img_path = os.path.join("graficos", img_name)
-            if os.path.exists(img_path):
-                story.append(Spacer(1, 12))
-                story.append(Image(img_path, width=6*inch, height=4*inch))
+        for buffer in (graficos or {}).values():
+            story.append(Spacer(1, 12))
+            story.append(Image(io.BytesIO(buffer.getvalue()), width=6*inch, height=4*inch))
 
         story.append(Spacer(1, 12))
         story.append(Paragraph("✅ Relatório gerado automaticamente com gráficos em tons pastéis para melhor visualização.", styles['Normal']))
 
-        doc.build(story)
-        print("✅ PDF gerado: orcamento_piscina.pdf")
+        with trabalho.gravando("orcamento_piscina.pdf") as temporario:
+            SimpleDocTemplate(temporario, pagesize=letter).build(story)
+        print(f"✅ PDF gerado: {trabalho.caminho('orcamento_piscina.pdf')}")
     except Exception as e:
         print(f"❌ Erro ao gerar PDF: {e}")
 
@@ -345,35 +215,36 @@ def main():
     """
     Função principal que orquestra todo o fluxo de execução.
     """
-    custo_unitario = {
-        "Blocos": 1.5,
-        "Tela para Quina Vivas (caixas)": 50,
-        "Impermeabilizante1 (caixas 20kg)": 100,
-        "Impermeabilizante2 (caixas 20kg)": 150,
-        "Cimento (sacos)": 25,
-        "Areia (m³)": 150,
-        "Ligmassa (litros)": 10,
-        "Revestimento (m²)": 60,
-        "Argamassa ACIII (kg)": 20,
-        "Rejunte Acrílico (sacos)": 40,
-        "Espaçadores (unidades)": 0.1
-    }
-    extras = {"custo_hidromassagem_kit": 5000}
-
-    preco_agua_por_litro = 0.01
+    # Preços da tabela versionada (precos/tabela_padrao.csv)
+    catalogo = abrir_catalogo()
+    custo_unitario, extras = catalogo.custo_unitario, catalogo.extras
+
+    preco_agua_por_litro = catalogo.preco_agua_por_litro
     caminhoes_enchimento = 3  # CORRIGIDO: nome consistente
     fluxo_mangueira_lph = 1000.0
 
     try:
         dados_piscina = coletar_dados_projeto()
-        materiais, custos, custos_fase, area = calcular_tudo(
+        dados_piscina["Versao_precos"] = catalogo.versao
+        materiais, custos, custos_fase, area = calcular_projeto(
             dados_piscina, custo_unitario, extras,
             preco_agua_por_litro, caminhoes_enchimento, fluxo_mangueira_lph
         )
 
-        gerar_graficos(materiais, custos, custos_fase, area)
-        salvar_excel(dados_piscina, materiais, custos, custos_fase)
-        gerar_pdf(dados_piscina, materiais, custos, custos_fase)
+        # Paginação do revestimento com o tamanho da peça informado
+        paginacao = paginar_projeto(dados_piscina)
+        if paginacao is not None:
+            for superficie, p in paginacao.items():
+                print(f"{superficie}: {p['pecas']} peças ({p['inteiras']} inteiras, {p['cortes']} cortes, "
+                      f"{p['sobras_reaproveitaveis']} sobras reaproveitáveis), perda {p['perda_pct']:.1f}%")
+            materiais["Peças de revestimento (unidades)"] = paginacao["Total"]["pecas"]
+
+        graficos = gerar_graficos(materiais, custos, custos_fase, area)
+        # Cada execução grava na sua pasta; as de mais de 24 h são apagadas
+        limpar_trabalhos()
+        trabalho = abrir_trabalho()
+        salvar_excel(dados_piscina, materiais, custos, custos_fase, trabalho, graficos)
+        gerar_pdf(dados_piscina, materiais, custos, custos_fase, trabalho, graficos)
         
         print("\n✅ Processamento concluído com sucesso!")
         
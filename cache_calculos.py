@@ -0,0 +1,151 @@
+# cache_calculos.py
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+from numbers import Number
+from typing import Callable, Dict, Iterable, Optional, Union
+
+import numpy as np
+
+from calculos import calcular_tudo
+
+
+def versao_tabela(tabela: Dict) -> str:
+    """
+    Identificador curto do conteúdo de uma tabela de preços (custo_unitario,
+    extras...). Tabelas com os mesmos itens têm a mesma versão.
+    """
+    conteudo = repr(sorted((str(k), _normalizar(v)) for k, v in tabela.items()))
+    return hashlib.sha1(conteudo.encode("utf-8")).hexdigest()[:16]
+
+
+def _normalizar(valor):
+    """
+    Forma canônica e hashable de um argumento: 5, 5.0 e 5.0000000001 viram a
+    mesma chave; textos perdem espaços nas pontas. Arrays (ex.: o perfil
+    do fundo) entram pelo dtype, pela forma e por um hash dos bytes.
+    """
+    if isinstance(valor, bool) or valor is None:
+        return valor
+    if isinstance(valor, Number):
+        return round(float(valor), 6)
+    if isinstance(valor, str):
+        return valor.strip()
+    if isinstance(valor, (list, tuple)):
+        return tuple(_normalizar(v) for v in valor)
+    if isinstance(valor, np.ndarray) and valor.ndim:
+        conteudo = hashlib.sha1(np.ascontiguousarray(valor).tobytes()).hexdigest()
+        return ("ndarray", valor.dtype.str, valor.shape, conteudo)
+    if hasattr(valor, "item"):  # escalares do numpy
+        return _normalizar(valor.item())
+    raise TypeError(f"Argumento sem forma canônica para o cache: {type(valor).__name__}")
+
+
+def _copiar(resultado):
+    # Tuplas de dicts rasos: uma cópia de cada dict basta. O resto (ex.:
+    # ResultadoOrcamento, com arrays) é copiado por inteiro
+    if isinstance(resultado, tuple):
+        return tuple(_copiar(r) for r in resultado)
+    if isinstance(resultado, dict):
+        return dict(resultado)
+    if isinstance(resultado, (int, float, str)) or resultado is None:
+        return resultado
+    return copy.deepcopy(resultado)
+
+
+class CacheCalculos:
+    """
+    Cache LRU limitado em volta de uma função de cálculo (por padrão calculos.calcular_tudo).
+
+    A chave é formada pelos argumentos normalizados. Argumentos do tipo dict
+    entram pela versão do conteúdo (versao_tabela): custo_unitario e extras
+    viram um hash, e dados_piscina ignora os campos de `campos_ignorados`
+    (ex.: nome do cliente), que não mudam o orçamento.
+
+    Cada chamada devolve uma cópia do resultado guardado, então quem chama
+    pode alterar os dicts sem estragar o cache.
+    """
+
+    def __init__(
+        self,
+        funcao: Callable = calcular_tudo,
+        tamanho_max: int = 1024,
+        campos_ignorados: Iterable[str] = ("Nome_projeto", "Num_pessoas_familia")
+    ):
+        if tamanho_max < 1:
+            raise ValueError("tamanho_max deve ser pelo menos 1")
+        self.funcao = funcao
+        self.tamanho_max = tamanho_max
+        self.campos_ignorados = frozenset(campos_ignorados)
+        self.acertos = 0
+        self.falhas = 0
+        self._entradas: "OrderedDict[tuple, tuple]" = OrderedDict()  # chave -> (versões de tabelas, resultado)
+        self._trava = threading.Lock()
+
+    def _chave(self, args, kwargs):
+        partes = []
+        versoes = set()
+        for valor in (*args, *(v for _, v in sorted(kwargs.items()))):
+            if isinstance(valor, dict):
+                versao = versao_tabela({k: v for k, v in valor.items() if k not in self.campos_ignorados})
+                versoes.add(versao)
+                partes.append(versao)
+            else:
+                partes.append(_normalizar(valor))
+        return tuple(partes) + tuple(sorted(kwargs)), frozenset(versoes)
+
+    def calcular(self, *args, **kwargs):
+        """
+        Mesma assinatura da função envolvida; consulta o cache antes de calcular.
+        """
+        chave, versoes = self._chave(args, kwargs)
+        with self._trava:
+            entrada = self._entradas.get(chave)
+            if entrada is not None:
+                self._entradas.move_to_end(chave)
+                self.acertos += 1
+                return _copiar(entrada[1])
+            self.falhas += 1
+
+        resultado = self.funcao(*args, **kwargs)
+
+        with self._trava:
+            self._entradas[chave] = (versoes, _copiar(resultado))
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.tamanho_max:
+                self._entradas.popitem(last=False)
+        return _copiar(resultado)
+
+    __call__ = calcular
+
+    def invalidar(self, tabela: Optional[Union[Dict, str]] = None) -> int:
+        """
+        Remove as entradas calculadas com `tabela` (um dict ou sua versao_tabela)
+        ou, sem argumento, esvazia o cache. Retorna quantas entradas saíram.
+
+        Como a chave já inclui a versão do conteúdo, uma tabela com preços novos
+        nunca acerta entradas antigas; invalidar libera a memória dessas
+        entradas obsoletas assim que a tabela muda.
+        """
+        with self._trava:
+            if tabela is None:
+                removidas = len(self._entradas)
+                self._entradas.clear()
+                return removidas
+            versao = tabela if isinstance(tabela, str) else versao_tabela(tabela)
+            obsoletas = [k for k, (versoes, _) in self._entradas.items() if versao in versoes]
+            for k in obsoletas:
+                del self._entradas[k]
+            return len(obsoletas)
+
+    def estatisticas(self) -> Dict[str, float]:
+        with self._trava:
+            total = self.acertos + self.falhas
+            return {
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "taxa_acerto": self.acertos / total if total else 0.0,
+                "tamanho": len(self._entradas),
+                "tamanho_max": self.tamanho_max,
+            }
@@ -1,6 +1,14 @@
 # calculos.py
-import math
-from typing import Dict, Tuple
+"""
+Núcleo de cálculo do orçamento de piscinas. Todos os pontos de entrada
+(app.py, App-Atualizado.py, app_streamlit_exemplo.py e o script do Colab)
+importam daqui.
+"""
+from typing import Dict, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+from superficies import Perfil, calcular_superficies
 
 def calcular_area(largura: float, comprimento: float) -> float:
     return largura * comprimento
@@ -8,38 +16,522 @@ def calcular_area(largura: float, comprimento: float) -> float:
 def calcular_perimetro(largura: float, comprimento: float) -> float:
     return 2 * (largura + comprimento)
 
-def calcular_blocos(area: float) -> float:
-    return area * 12.5
 
-def calcular_tela(perimetro: float, profundidade: float) -> float:
-    return (perimetro + 4 * profundidade) / 5
+# =======================
+# TABELA DE COEFICIENTES DE MATERIAIS
+# =======================
+
+# Variáveis de cada piscina, na ordem das colunas da matriz de variáveis
+VARIAVEIS = (
+    "area", "perimetro", "profundidade", "perimetro_x_profundidade", "quinas_x_profundidade",
+    "fundo", "paredes", "molhada",
+    "volume", "caminhoes", "horas_enchimento", "constante"
+)
+
+# Cada material é uma combinação linear das VARIAVEIS (coeficientes omitidos
+# valem 0), seguida de uma regra de arredondamento (None, "teto" ou o número
+# de casas decimais) e de uma condição de inclusão opcional.
+# Para adicionar um material basta adicionar uma linha.
+TABELA_MATERIAIS = [
+    # material,                              coeficientes, arredondamento, condição
+    ("Blocos",                               {"area": 12.5}, None, None),
+    ("Tela para Quina Vivas (caixas)",       {"perimetro": 1 / 5, "quinas_x_profundidade": 1 / 5}, None, None),
+    ("Impermeabilizante1 (caixas 20kg)",     {"area": 1 / 9}, "teto", None),
+    ("Impermeabilizante2 (caixas 20kg)",     {"area": 1 / 4}, "teto", None),
+    ("Cimento (sacos)",                      {"area": (0.013 + 0.038 + 0.14) / 50}, None, None),
+    ("Areia (m³)",                           {"area": 0.065 + 0.004 + 0.025}, None, None),
+    ("Ligmassa (litros)",                    {"area": 0.0026 + 0.05}, None, None),
+    ("Argamassa ACIII (kg)",                 {"area": 0.45}, None, None),
+    ("Rejunte Acrílico (sacos)",             {"area": 0.05 / 20}, None, None),
+    ("Espaçadores (unidades)",               {"area": 12}, None, None),
+    ("Revestimento (m²)",                    {"area": 1}, None, "revestimento"),
+    ("Hidromassagem (kit)",                  {"constante": 1}, "teto", "hidromassagem"),
+    ("Manta Vinilica (m²)",                  {"area": 1.10, "perimetro_x_profundidade": 1.10}, 3, "vinilico"),
+    ("Volume de água (L)",                   {"volume": 1000}, 2, None),
+    ("Caminhões de enchimento (unidades)",   {"caminhoes": 1}, "teto", None),
+    ("Tempo estimado enchimento (h)",        {"horas_enchimento": 1}, 2, None),
+    ("Custo de enchimento (R$)",             {"volume": 1000}, None, None),
+]
+
+
+
+# =======================
+# REGISTRO DE MATERIAIS
+# =======================
+
+class Material(NamedTuple):
+    id: int        # posição do material em todos os vetores por material
+    nome: str      # ex.: "Impermeabilizante1"
+    unidade: str   # ex.: "caixas 20kg" ("" quando a tabela não informa)
+    rotulo: str    # texto exibido e chave dos dicts, ex.: "Impermeabilizante1 (caixas 20kg)"
+
+
+def _material(id_material: int, rotulo: str) -> Material:
+    nome, _, unidade = rotulo.partition(" (")
+    return Material(id_material, nome, unidade.rstrip(")"), rotulo)
+
+
+# Quantidades, preços e custos circulam como arrays de tamanho fixo indexados
+# pelo id; os rótulos só entram na apresentação (Excel, PDF, Streamlit) e na
+# conversão de dicts de entrada (vetor_materiais).
+REGISTRO_MATERIAIS = tuple(_material(i, linha[0]) for i, linha in enumerate(TABELA_MATERIAIS))
+ID_MATERIAL = {m.rotulo: m.id for m in REGISTRO_MATERIAIS}
+MATERIAIS = [m.rotulo for m in REGISTRO_MATERIAIS]
+NOMES = np.array([m.nome for m in REGISTRO_MATERIAIS], dtype=object)
+UNIDADES = np.array([m.unidade for m in REGISTRO_MATERIAIS], dtype=object)
+ROTULOS = np.array(MATERIAIS, dtype=object)
+
+COEFICIENTES = np.array(
+    [[linha[1].get(v, 0.0) for v in VARIAVEIS] for linha in TABELA_MATERIAIS], dtype=float
+)  # materiais x variáveis
+_ARREDONDAMENTOS = [linha[2] for linha in TABELA_MATERIAIS]
+_TETO = np.array([a == "teto" for a in _ARREDONDAMENTOS])
+_CASAS = {casas: np.array([a == casas for a in _ARREDONDAMENTOS])
+          for casas in {a for a in _ARREDONDAMENTOS if isinstance(a, int)}}
+_CONDICOES = [linha[3] for linha in TABELA_MATERIAIS]
+
+# Modelo de superfícies (quando o perfil do fundo é informado): a mesma taxa
+# por m² da tabela, mas aplicada à superfície onde o material é usado em vez
+# da área do fundo em planta. A manta, que já somava fundo e paredes, passa
+# a usar a superfície molhada exata.
+SUPERFICIE_MATERIAL = {
+    "Blocos":                           "paredes",
+    "Impermeabilizante1 (caixas 20kg)": "molhada",
+    "Impermeabilizante2 (caixas 20kg)": "molhada",
+    "Cimento (sacos)":                  "molhada",
+    "Areia (m³)":                       "molhada",
+    "Ligmassa (litros)":                "molhada",
+    "Argamassa ACIII (kg)":             "molhada",
+    "Rejunte Acrílico (sacos)":         "molhada",
+    "Espaçadores (unidades)":           "molhada",
+    "Revestimento (m²)":                "molhada",
+    "Manta Vinilica (m²)":              "molhada",
+}
+
+
+def _coeficientes_superficie(material: str, coeficientes: Dict[str, float]) -> Dict[str, float]:
+    superficie = SUPERFICIE_MATERIAL.get(material)
+    if superficie is None:
+        return coeficientes
+    coeficientes = dict(coeficientes)
+    taxa = coeficientes.pop("area")
+    coeficientes.pop("perimetro_x_profundidade", None)
+    coeficientes[superficie] = taxa
+    return coeficientes
+
+
+COEFICIENTES_SUPERFICIES = np.array(
+    [[_coeficientes_superficie(linha[0], linha[1]).get(v, 0.0) for v in VARIAVEIS] for linha in TABELA_MATERIAIS],
+    dtype=float
+)
+
+# Linhas que só aparecem nos custos, não na lista de materiais
+# (a quantidade é o volume em litros e o preço é o da água)
+SOMENTE_CUSTO = {"Custo de enchimento (R$)"}
+_AGUA = ID_MATERIAL["Custo de enchimento (R$)"]
+_HIDROMASSAGEM = ID_MATERIAL["Hidromassagem (kit)"]
+_LISTADOS = np.array([m not in SOMENTE_CUSTO for m in MATERIAIS])
+
+# Materiais cujo preço vem de `extras` e não de `custo_unitario`
+PRECOS_EXTRAS = {"Hidromassagem (kit)": "custo_hidromassagem_kit"}
+
+# Alocação esparsa materiais x fases: (material, fase, fração do custo).
+# As frações de cada material somam 1, então a soma das fases é igual ao
+# custo total. Materiais usados em duas fases têm o custo dividido entre elas.
+ALOCACAO_FASES = [
+    ("Blocos",                             "Alvenaria", 1.0),
+    ("Cimento (sacos)",                    "Alvenaria", 0.5),
+    ("Impermeabilizante1 (caixas 20kg)",   "Impermeabilização", 1.0),
+    ("Impermeabilizante2 (caixas 20kg)",   "Impermeabilização", 1.0),
+    ("Tela para Quina Vivas (caixas)",     "Impermeabilização", 1.0),
+    ("Cimento (sacos)",                    "Chapisco/Reboco", 0.5),
+    ("Areia (m³)",                         "Chapisco/Reboco", 1.0),
+    ("Argamassa ACIII (kg)",               "Chapisco/Reboco", 0.5),
+    ("Ligmassa (litros)",                  "Chapisco/Reboco", 1.0),
+    ("Revestimento (m²)",                  "Revestimento", 1.0),
+    ("Argamassa ACIII (kg)",               "Revestimento", 0.5),
+    ("Manta Vinilica (m²)",                "Revestimento", 1.0),
+    ("Rejunte Acrílico (sacos)",           "Acabamento", 1.0),
+    ("Espaçadores (unidades)",             "Acabamento", 1.0),
+    ("Volume de água (L)",                 "Enchimento", 1.0),
+    ("Caminhões de enchimento (unidades)", "Enchimento", 1.0),
+    ("Tempo estimado enchimento (h)",      "Enchimento", 1.0),
+    ("Custo de enchimento (R$)",           "Enchimento", 1.0),
+    ("Hidromassagem (kit)",                "Extras", 1.0),
+]
+
+FASES = list(dict.fromkeys(fase for _, fase, _ in ALOCACAO_FASES))
+
+# Formato coordenado ordenado por fase: as parcelas de cada fase ficam
+# contíguas e a soma de cada fase é uma redução sobre uma fatia.
+_alocacao = sorted(ALOCACAO_FASES, key=lambda a: FASES.index(a[1]))
+_ALOC_MATERIAL = np.array([ID_MATERIAL[m] for m, _, _ in _alocacao])
+_ALOC_FASE = np.array([FASES.index(f) for _, f, _ in _alocacao])
+_ALOC_FRACAO = np.array([fr for _, _, fr in _alocacao], dtype=float)
+_INICIO_FASE = np.searchsorted(_ALOC_FASE, np.arange(len(FASES) + 1))
+_FASES_SEM_EXTRAS = np.flatnonzero([fase != "Extras" for fase in FASES])
+
+_soma_fracoes = np.bincount(_ALOC_MATERIAL, weights=_ALOC_FRACAO, minlength=len(MATERIAIS))
+if not np.allclose(_soma_fracoes, 1.0):
+    raise ValueError("As frações de ALOCACAO_FASES de cada material devem somar 1: "
+                     + ", ".join(m for m, s in zip(MATERIAIS, _soma_fracoes) if not np.isclose(s, 1.0)))
+
+
+def alocar_fases(custos: np.ndarray, eixo: int = -1) -> np.ndarray:
+    """
+    Custos por material -> custos por fase, multiplicando pela matriz esparsa
+    de ALOCACAO_FASES ao longo de `eixo` (o eixo dos materiais). Serve para
+    uma piscina ou um lote.
+    """
+    forma = [1] * custos.ndim
+    forma[eixo] = -1
+    parcelas = np.take(custos, _ALOC_MATERIAL, axis=eixo) * _ALOC_FRACAO.reshape(forma)
+    fatia = [slice(None)] * custos.ndim
+    fases = []
+    for j in range(len(FASES)):
+        fatia[eixo] = slice(_INICIO_FASE[j], _INICIO_FASE[j + 1])
+        fases.append(np.add.reduce(parcelas[tuple(fatia)], axis=eixo))
+    return np.stack(fases, axis=eixo)
+
+
+def _produto(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Produto de matrizes a @ b acumulado coluna a coluna. Ao contrário do BLAS,
+    a ordem das somas não depende do número de linhas, então uma piscina
+    sozinha e a mesma piscina dentro de um lote dão exatamente o mesmo valor.
+    """
+    resultado = np.zeros((a.shape[0], b.shape[1]))
+    for k in range(a.shape[1]):
+        resultado += a[:, k:k + 1] * b[k]
+    return resultado
+
+
+def matriz_variaveis(
+    largura,
+    comprimento,
+    profundidade_min,
+    profundidade_max,
+    caminhoes_enchimento=3,
+    fluxo_mangueira_lph=1000.0
+) -> np.ndarray:
+    """
+    Monta a matriz piscinas x VARIAVEIS de piscinas retangulares. Aceita escalares ou arrays.
+    """
+    largura = np.atleast_1d(np.asarray(largura, dtype=float))
+    comprimento = np.atleast_1d(np.asarray(comprimento, dtype=float))
+    return matriz_variaveis_forma(
+        calcular_area(largura, comprimento), calcular_perimetro(largura, comprimento), 4,
+        profundidade_min, profundidade_max, caminhoes_enchimento, fluxo_mangueira_lph
+    )
+
+
+def matriz_variaveis_forma(
+    area,
+    perimetro,
+    quinas,
+    profundidade_min,
+    profundidade_max,
+    caminhoes_enchimento=3,
+    fluxo_mangueira_lph=1000.0
+) -> np.ndarray:
+    """
+    Matriz piscinas x VARIAVEIS de um contorno qualquer, a partir da área, do
+    perímetro e do número de quinas vivas (ver geometria.medir_contornos).
+    """
+    area = np.atleast_1d(np.asarray(area, dtype=float))
+    perimetro = np.atleast_1d(np.asarray(perimetro, dtype=float))
+    quinas = np.asarray(quinas, dtype=float)
+    profundidade = (np.atleast_1d(np.asarray(profundidade_min, dtype=float))
+                    + np.atleast_1d(np.asarray(profundidade_max, dtype=float))) / 2
+    caminhoes = np.asarray(caminhoes_enchimento, dtype=float)
+    volume = area * profundidade
+    horas = volume * 1000 / (caminhoes * np.asarray(fluxo_mangueira_lph, dtype=float))
+    # Sem perfil, as paredes são aproximadas por perímetro x profundidade média
+    paredes = perimetro * profundidade
+    return np.column_stack(np.broadcast_arrays(
+        area, perimetro, profundidade, paredes, quinas * profundidade,
+        area, paredes, area + paredes,
+        volume, caminhoes, horas, 1.0
+    ))
+
+
+def matriz_variaveis_perfil(
+    largura,
+    comprimento,
+    posicoes,
+    profundidades,
+    caminhoes_enchimento=3,
+    fluxo_mangueira_lph=1000.0
+) -> np.ndarray:
+    """
+    Matriz piscinas x VARIAVEIS de piscinas retangulares com perfil de fundo
+    (ver superficies.py): fundo, paredes, superfície molhada e volume exatos.
+    Use com COEFICIENTES_SUPERFICIES.
+    """
+    largura = np.atleast_1d(np.asarray(largura, dtype=float))
+    comprimento = np.atleast_1d(np.asarray(comprimento, dtype=float))
+    sup = calcular_superficies(largura, comprimento, posicoes, profundidades)
+    area = calcular_area(largura, comprimento)
+    perimetro = calcular_perimetro(largura, comprimento)
+    caminhoes = np.asarray(caminhoes_enchimento, dtype=float)
+    horas = sup["volume"] * 1000 / (caminhoes * np.asarray(fluxo_mangueira_lph, dtype=float))
+    return np.column_stack(np.broadcast_arrays(
+        area, perimetro, sup["volume"] / area, sup["paredes"], sup["altura_quinas"],
+        sup["fundo"], sup["paredes"], sup["molhada"],
+        sup["volume"], caminhoes, horas, 1.0
+    ))
+
+
+def _variaveis_perfil(largura, comprimento, profundidade_min, profundidade_max, perfil,
+                      caminhoes_enchimento, fluxo_mangueira_lph):
+    """
+    (variáveis, coeficientes) conforme o perfil: None mantém o modelo da
+    profundidade média; "rampa" liga profundidade_min a profundidade_max em
+    linha reta; um par (posicoes, profundidades) descreve qualquer perfil.
+    """
+    if perfil is None:
+        return (matriz_variaveis(largura, comprimento, profundidade_min, profundidade_max,
+                                 caminhoes_enchimento, fluxo_mangueira_lph), COEFICIENTES)
+    if isinstance(perfil, str):
+        if perfil != "rampa":
+            raise ValueError(f"Perfil desconhecido: {perfil}")
+        posicoes = np.array([0.0, 1.0])
+        profundidades = np.column_stack(np.broadcast_arrays(
+            np.atleast_1d(np.asarray(profundidade_min, dtype=float)),
+            np.atleast_1d(np.asarray(profundidade_max, dtype=float))
+        ))
+    else:
+        posicoes, profundidades = perfil
+    return (matriz_variaveis_perfil(largura, comprimento, posicoes, profundidades,
+                                    caminhoes_enchimento, fluxo_mangueira_lph), COEFICIENTES_SUPERFICIES)
+
+
+def mascara_materiais(usar_revestimento, hidromassagem, vinilico=False) -> np.ndarray:
+    """
+    Matriz booleana piscinas x materiais indicando quais materiais entram no orçamento.
+    """
+    condicoes = {
+        "revestimento": np.atleast_1d(np.asarray(usar_revestimento, dtype=bool)),
+        "hidromassagem": np.atleast_1d(np.asarray(hidromassagem, dtype=bool)),
+        "vinilico": np.atleast_1d(np.asarray(vinilico, dtype=bool)),
+    }
+    n = max(len(c) for c in condicoes.values())
+    colunas = [np.ones(n, dtype=bool) if cond is None else np.broadcast_to(condicoes[cond], (n,))
+               for cond in _CONDICOES]
+    return np.column_stack(colunas)
+
+
+def arredondar_quantidades(quantidades: np.ndarray) -> np.ndarray:
+    """
+    Aplica a regra de arredondamento de cada material (última dimensão) no próprio array.
+    """
+    # Arredonda para cima descartando o ruído de ponto flutuante (ex.: 18 * (1/9))
+    quantidades[..., _TETO] = np.ceil(np.round(quantidades[..., _TETO], 9))
+    for casas, linhas in _CASAS.items():
+        quantidades[..., linhas] = np.round(quantidades[..., linhas], casas)
+    return quantidades
+
+
+def calcular_quantidades(
+    variaveis: np.ndarray,
+    presentes: np.ndarray,
+    arredondar: bool = True,
+    coeficientes: np.ndarray = COEFICIENTES
+) -> np.ndarray:
+    """
+    Quantidades piscinas x materiais: um único produto de matrizes seguido das
+    regras de arredondamento de cada linha da tabela.
+    """
+    quantidades = _produto(variaveis, coeficientes.T)
+    if arredondar:
+        arredondar_quantidades(quantidades)
+    return np.where(presentes, quantidades, 0.0)
+
+
+def vetor_materiais(valores: Dict[str, float], padrao: float = 0.0) -> np.ndarray:
+    """
+    Converte um dict {rótulo: valor} num vetor indexado pelo id do material.
+    Rótulos fora do registro são ignorados, como nos dicts de preços antigos.
+    """
+    vetor = np.full(len(REGISTRO_MATERIAIS), padrao, dtype=float)
+    for rotulo, valor in valores.items():
+        i = ID_MATERIAL.get(rotulo)
+        if i is not None:
+            vetor[i] = valor
+    return vetor
+
+
+def vetor_precos(
+    custo_unitario: Dict[str, float],
+    extras: Dict[str, float],
+    preco_agua_por_litro: float = 0.01
+) -> np.ndarray:
+    """
+    Preço unitário de cada material, indexado pelo id do material.
+    """
+    precos = vetor_materiais(custo_unitario)
+    for mat, chave in PRECOS_EXTRAS.items():
+        precos[ID_MATERIAL[mat]] = extras.get(chave, 0)
+    precos[_AGUA] = preco_agua_por_litro
+    return precos
 
-def calcular_impermeabilizante1(area: float) -> int:
-    return math.ceil(area / 9)
 
-def calcular_impermeabilizante2(area: float) -> int:
-    return math.ceil(area / 4)
+def calcular_custos(quantidades: np.ndarray, precos: np.ndarray) -> np.ndarray:
+    """
+    Custo de cada material (última dimensão); a água é cobrada em centavos inteiros.
+    """
+    custos = quantidades * precos
+    custos[..., _AGUA] = np.round(custos[..., _AGUA], 2)
+    return custos
 
-def calcular_cimento(area: float) -> float:
-    return (0.013 + 0.038 + 0.14) * area / 50
 
-def calcular_areia(area: float) -> float:
-    return (0.065 + 0.004 + 0.025) * area
+# =======================
+# CUSTOS EM CENTAVOS (int64)
+# =======================
 
-def calcular_ligmassa(area: float) -> float:
-    return (0.0026 + 0.05) * area
+# No modo centavos todo valor em dinheiro é um int64 de centavos: somas de
+# lotes grandes são exatas e não dependem da ordem. Cada custo de material
+# é arredondado uma única vez, pela regra do material:
+#   "meio_acima" (0,5 centavo sobe), "meio_par", "teto" ou "piso".
+REGRA_CENTAVOS_PADRAO = "meio_acima"
+REGRAS_CENTAVOS = {
+    "Custo de enchimento (R$)": "meio_acima",  # como a conta de água
+}
+_REGRAS = [REGRAS_CENTAVOS.get(mat, REGRA_CENTAVOS_PADRAO) for mat in MATERIAIS]
+_ARREDONDAR_CENTAVOS = {
+    "meio_acima": lambda v: np.floor(v + 0.5),
+    "meio_par": np.round,
+    "teto": np.ceil,
+    "piso": np.floor,
+}
+if set(_REGRAS) - set(_ARREDONDAR_CENTAVOS):
+    raise ValueError(f"Regra de arredondamento desconhecida: {set(_REGRAS) - set(_ARREDONDAR_CENTAVOS)}")
+_MASCARAS_REGRA = {regra: np.array([r == regra for r in _REGRAS]) for regra in dict.fromkeys(_REGRAS)}
 
-def calcular_revestimento(area: float) -> float:
-    return area
+# Materiais divididos entre fases: (ids das parcelas em _ALOC_*, material).
+# Só nesses a divisão em centavos pode deixar sobra.
+_DIVIDIDOS = [(np.flatnonzero(_ALOC_MATERIAL == i), i)
+              for i in np.unique(_ALOC_MATERIAL) if np.count_nonzero(_ALOC_MATERIAL == i) > 1]
 
-def calcular_argamassa(area: float) -> float:
-    return 0.45 * area
 
-def calcular_rejunte(area: float) -> float:
-    return 0.05 * area / 20
+def calcular_custos_centavos(quantidades: np.ndarray, precos: np.ndarray) -> np.ndarray:
+    """
+    Custo de cada material (última dimensão) em centavos int64, arredondado
+    pela regra de REGRAS_CENTAVOS. Os preços continuam em reais (podem ter
+    frações de centavo, como o litro de água).
+    """
+    # O round a 6 casas descarta o ruído do float (ex.: 1.005 * 100 = 100.49999...)
+    exatos = np.round(quantidades * (precos * 100), 6)
+    if len(_MASCARAS_REGRA) == 1:
+        return _ARREDONDAR_CENTAVOS[_REGRAS[0]](exatos).astype(np.int64)
+    centavos = np.empty(exatos.shape, dtype=np.int64)
+    for regra, linhas in _MASCARAS_REGRA.items():
+        centavos[..., linhas] = _ARREDONDAR_CENTAVOS[regra](exatos[..., linhas])
+    return centavos
 
-def calcular_espacadores(area: float) -> float:
-    return 12 * area
+
+def alocar_fases_centavos(custos: np.ndarray) -> np.ndarray:
+    """
+    Versão de alocar_fases para centavos (materiais na última dimensão).
+
+    Cada parcela recebe o piso da sua fração. Os centavos que sobram de um
+    material dividido vão, um a um, para as parcelas com maior resto (em
+    empate, a fase que vem primeiro em FASES). Assim a soma das fases é
+    sempre igual, ao centavo, à soma dos materiais.
+    """
+    exatas = custos[..., _ALOC_MATERIAL] * _ALOC_FRACAO
+    parcelas = np.floor(exatas).astype(np.int64)
+    for indices, i in _DIVIDIDOS:
+        sobra = custos[..., i] - parcelas[..., indices].sum(axis=-1)
+        ordem = np.argsort(-(exatas[..., indices] - parcelas[..., indices]), axis=-1, kind="stable")
+        posicao = np.argsort(ordem, axis=-1, kind="stable")
+        parcelas[..., indices] += posicao < sobra[..., None]
+    fases = [np.add.reduce(parcelas[..., _INICIO_FASE[j]:_INICIO_FASE[j + 1]], axis=-1)
+             for j in range(len(FASES))]
+    return np.stack(fases, axis=-1)
+
+
+# =======================
+# RESULTADO
+# =======================
+
+class ResultadoOrcamento:
+    """
+    Resultado compacto de um orçamento: vetores indexados pelo id do material
+    (REGISTRO_MATERIAIS) e pela posição em FASES, em vez de dicts com chaves
+    em texto. Os dicts só são montados quando pedidos, e o objeto ainda pode
+    ser desempacotado como a antiga tupla:
+
+        materiais, custos, custos_fase, area = calcular_tudo(...)
+    """
+    __slots__ = ("quantidades", "custos_materiais", "custos_fases", "presentes", "area", "centavos")
+
+    def __init__(self, quantidades, custos_materiais, custos_fases, presentes, area, centavos=False):
+        self.quantidades = quantidades
+        self.custos_materiais = custos_materiais  # reais (float) ou, com centavos=True, int64
+        self.custos_fases = custos_fases
+        self.presentes = presentes
+        self.area = area
+        self.centavos = centavos
+
+    @property
+    def ids_materiais(self) -> np.ndarray:
+        """Ids dos materiais da lista de materiais (presentes e sem as linhas só de custo)."""
+        return np.flatnonzero(self.presentes & _LISTADOS)
+
+    @property
+    def ids_custos(self) -> np.ndarray:
+        """Ids dos materiais com custo neste orçamento."""
+        return np.flatnonzero(self.presentes)
+
+    @property
+    def ids_fases(self) -> np.ndarray:
+        """Posições em FASES exibidas neste orçamento ("Extras" só com hidromassagem)."""
+        if self.presentes[_HIDROMASSAGEM]:
+            return np.arange(len(FASES))
+        return _FASES_SEM_EXTRAS
+
+    @property
+    def materiais(self) -> Dict[str, float]:
+        return {
+            MATERIAIS[i]: int(self.quantidades[i]) if _TETO[i] else float(self.quantidades[i])
+            for i in self.ids_materiais
+        }
+
+    def _reais(self, valor) -> float:
+        return int(valor) / 100 if self.centavos else float(valor)
+
+    @property
+    def custos(self) -> Dict[str, float]:
+        return {MATERIAIS[i]: self._reais(self.custos_materiais[i]) for i in self.ids_custos}
+
+    @property
+    def custos_fase(self) -> Dict[str, float]:
+        return {FASES[j]: self._reais(self.custos_fases[j]) for j in self.ids_fases}
+
+    @property
+    def total(self) -> float:
+        return self._reais(self.custos_materiais.sum())
+
+    @property
+    def total_centavos(self) -> int:
+        if self.centavos:
+            return int(self.custos_materiais.sum())
+        return int(np.floor(np.round(self.custos_materiais.sum() * 100, 6) + 0.5))
+
+    def __iter__(self):
+        return iter((self.materiais, self.custos, self.custos_fase, self.area))
+
+    def __getitem__(self, indice):
+        return tuple(self)[indice]
+
+    def __repr__(self) -> str:
+        return f"ResultadoOrcamento(area={self.area:.2f}, total=R$ {self.total:,.2f})"
+
+
+# =======================
+# CÁLCULOS PRINCIPAIS
+# =======================
 
 def calcular_tudo(
     largura: float,
@@ -49,53 +541,263 @@ def calcular_tudo(
     usar_revestimento: bool,
     hidromassagem: bool,
     custo_unitario: Dict[str, float],
-    extras: Dict[str, float]
-) -> Tuple[Dict[str, float], Dict[str, float], Dict[str, float], float]:
-    
-    profundidade = (profundidade_min + profundidade_max) / 2
-    area = calcular_area(largura, comprimento)
-    perimetro = calcular_perimetro(largura, comprimento)
+    extras: Dict[str, float],
+    vinilico: bool = False,
+    preco_agua_por_litro: float = 0.01,
+    caminhoes_enchimento: int = 3,
+    fluxo_mangueira_lph: float = 1000.0,
+    centavos: bool = False,
+    perfil: Optional[Union[str, Perfil]] = None
+) -> ResultadoOrcamento:
+    """
+    Orçamento de uma piscina. Com `centavos=True` os custos do resultado são
+    int64 em centavos (ver calcular_custos_centavos e alocar_fases_centavos).
 
-    materiais = {
-        "Blocos": calcular_blocos(area),
-        "Tela para Quina Vivas (caixas)": calcular_tela(perimetro, profundidade),
-        "Impermeabilizante1 (caixas 20kg)": calcular_impermeabilizante1(area),
-        "Impermeabilizante2 (caixas 20kg)": calcular_impermeabilizante2(area),
-        "Cimento (sacos)": calcular_cimento(area),
-        "Areia (m³)": calcular_areia(area),
-        "Ligmassa (litros)": calcular_ligmassa(area),
-        "Argamassa ACIII (kg)": calcular_argamassa(area),
-        "Rejunte Acrílico (sacos)": calcular_rejunte(area),
-        "Espaçadores (unidades)": calcular_espacadores(area)
-    }
+    Com `perfil` ("rampa" ou um perfil de superficies.py) os materiais usam o
+    modelo de superfícies: blocos sobre as paredes, impermeabilização e
+    revestimentos sobre a superfície molhada e o volume exato do fundo.
+    """
+    variaveis, coeficientes = _variaveis_perfil(largura, comprimento, profundidade_min, profundidade_max,
+                                                perfil, caminhoes_enchimento, fluxo_mangueira_lph)
+    return orcamento_variaveis(variaveis, usar_revestimento, hidromassagem, vinilico,
+                               vetor_precos(custo_unitario, extras, preco_agua_por_litro), centavos,
+                               coeficientes)
 
-    if usar_revestimento:
-        materiais["Revestimento (m²)"] = calcular_revestimento(area)
 
-    if hidromassagem:
-        materiais["Hidromassagem (kit)"] = 1
+def orcamento_variaveis(
+    variaveis: np.ndarray,
+    usar_revestimento: bool,
+    hidromassagem: bool,
+    vinilico: bool,
+    precos: np.ndarray,
+    centavos: bool = False,
+    coeficientes: np.ndarray = COEFICIENTES
+) -> ResultadoOrcamento:
+    """
+    Orçamento de uma piscina já descrita por uma linha da matriz de variáveis
+    (matriz_variaveis, matriz_variaveis_forma ou matriz_variaveis_perfil).
+    """
+    presentes = mascara_materiais(usar_revestimento, hidromassagem, vinilico)[0]
+    quantidades = calcular_quantidades(variaveis, presentes, coeficientes=coeficientes)[0]
+    area = float(variaveis[0, VARIAVEIS.index("area")])
+    if centavos:
+        custos = calcular_custos_centavos(quantidades, precos)
+        return ResultadoOrcamento(quantidades, custos, alocar_fases_centavos(custos), presentes, area, True)
+    custos = calcular_custos(quantidades, precos)
+    return ResultadoOrcamento(quantidades, custos, alocar_fases(custos), presentes, area)
+
+
+def calcular_projeto(
+    dados_piscina: Dict[str, float],
+    custo_unitario: Dict[str, float],
+    extras: Dict[str, float],
+    preco_agua_por_litro: float = 0.01,
+    caminhoes_enchimento: int = 3,
+    fluxo_mangueira_lph: float = 1000.0,
+    centavos: bool = False,
+    perfil: Optional[Union[str, Perfil]] = None
+) -> ResultadoOrcamento:
+    """
+    calcular_tudo a partir do dict coletado nas interfaces (coletar_dados_projeto,
+    Streamlit): "Largura", "Comprimento", "Profundidade_min", "Profundidade_max",
+    "Usar_revestimento", "Vai_hidromassagem" e "Tipo_piscina".
+    """
+    return calcular_tudo(
+        dados_piscina["Largura"],
+        dados_piscina["Comprimento"],
+        dados_piscina["Profundidade_min"],
+        dados_piscina["Profundidade_max"],
+        dados_piscina.get("Usar_revestimento") == "Revestimento",
+        dados_piscina.get("Vai_hidromassagem") == "Sim",
+        custo_unitario,
+        extras,
+        vinilico=dados_piscina.get("Tipo_piscina") == "Vinilico",
+        preco_agua_por_litro=preco_agua_por_litro,
+        caminhoes_enchimento=caminhoes_enchimento,
+        fluxo_mangueira_lph=fluxo_mangueira_lph,
+        centavos=centavos,
+        perfil=perfil
+    )
+
+
+# =======================
+# RECÁLCULO INCREMENTAL
+# =======================
 
-    # Custos por material
-    custos = {}
-    for mat, q in materiais.items():
-        if mat == "Hidromassagem (kit)":
-            custos[mat] = extras.get("custo_hidromassagem_kit", 0)
+class CalculoIncremental:
+    """
+    Orçamento de uma piscina que guarda os estágios intermediários
+    (quantidades -> custos -> custos por fase) e, a cada alteração,
+    recalcula apenas o que depende dela:
+
+    - preço de um material: só o custo desse material e as fases que o contêm;
+    - revestimento / hidromassagem / vinílico: só as linhas de material com essa condição;
+    - dimensões: tudo.
+
+    `resultado()` devolve o mesmo que calcular_tudo com os valores atuais.
+    """
+
+    def __init__(
+        self,
+        largura: float,
+        comprimento: float,
+        profundidade_min: float,
+        profundidade_max: float,
+        usar_revestimento: bool,
+        hidromassagem: bool,
+        custo_unitario: Dict[str, float],
+        extras: Dict[str, float],
+        vinilico: bool = False,
+        preco_agua_por_litro: float = 0.01,
+        caminhoes_enchimento: int = 3,
+        fluxo_mangueira_lph: float = 1000.0
+    ):
+        self.custo_unitario = dict(custo_unitario)
+        self.extras = dict(extras)
+        self.preco_agua_por_litro = preco_agua_por_litro
+        self.enchimento = (caminhoes_enchimento, fluxo_mangueira_lph)
+        self._opcoes = {
+            "revestimento": bool(usar_revestimento),
+            "hidromassagem": bool(hidromassagem),
+            "vinilico": bool(vinilico),
+        }
+        self._precos = vetor_precos(self.custo_unitario, self.extras, self.preco_agua_por_litro)
+        self.alterar_geometria(largura, comprimento, profundidade_min, profundidade_max)
+
+    def alterar_geometria(self, largura, comprimento, profundidade_min, profundidade_max):
+        """
+        Novas dimensões mudam todas as quantidades: recalcula a cadeia inteira.
+        """
+        self.geometria = (largura, comprimento, profundidade_min, profundidade_max)
+        self._variaveis = matriz_variaveis(*self.geometria, *self.enchimento)
+        self._presentes = mascara_materiais(
+            self._opcoes["revestimento"], self._opcoes["hidromassagem"], self._opcoes["vinilico"]
+        )[0]
+        self._quantidades = calcular_quantidades(self._variaveis, self._presentes)[0]
+        self._custos = calcular_custos(self._quantidades, self._precos)
+        self._fases = alocar_fases(self._custos)
+
+    def alterar_preco(self, material: str, valor: float):
+        i = ID_MATERIAL[material]
+        if i == _AGUA:
+            self.preco_agua_por_litro = valor
+        elif material in PRECOS_EXTRAS:
+            self.extras[PRECOS_EXTRAS[material]] = valor
         else:
-            custos[mat] = q * custo_unitario.get(mat, 0)
-
-    # Fases
-    fases = {
-        "Alvenaria": ["Blocos", "Cimento (sacos)"],
-        "Impermeabilização": ["Impermeabilizante1 (caixas 20kg)", "Impermeabilizante2 (caixas 20kg)"],
-        "Chapisco/Reboco": ["Cimento (sacos)", "Areia (m³)", "Argamassa ACIII (kg)"],
-        "Revestimento": ["Revestimento (m²)", "Argamassa ACIII (kg)"],
-        "Acabamento": ["Rejunte Acrílico (sacos)", "Espaçadores (unidades)"]
-    }
-    if hidromassagem:
-        fases["Extras"] = ["Hidromassagem (kit)"]
+            self.custo_unitario[material] = valor
+        self._precos[i] = valor
+        self._atualizar_custos([i])
+
+    def alterar_precos(self, custo_unitario: Dict[str, float] = None, extras: Dict[str, float] = None):
+        """
+        Troca a tabela de preços inteira, recalculando só os materiais cujo preço mudou.
+        """
+        if custo_unitario is not None:
+            self.custo_unitario = dict(custo_unitario)
+        if extras is not None:
+            self.extras = dict(extras)
+        precos = vetor_precos(self.custo_unitario, self.extras, self.preco_agua_por_litro)
+        alterados = np.flatnonzero(precos != self._precos)
+        self._precos = precos
+        self._atualizar_custos(alterados)
+
+    def alterar_revestimento(self, usar_revestimento: bool):
+        self._alterar_opcao("revestimento", usar_revestimento)
+
+    def alterar_hidromassagem(self, hidromassagem: bool):
+        self._alterar_opcao("hidromassagem", hidromassagem)
+
+    def alterar_vinilico(self, vinilico: bool):
+        self._alterar_opcao("vinilico", vinilico)
+
+    def _alterar_opcao(self, condicao: str, valor: bool):
+        if self._opcoes[condicao] == bool(valor):
+            return
+        self._opcoes[condicao] = bool(valor)
+        linhas = [i for i, c in enumerate(_CONDICOES) if c == condicao]
+        self._presentes[linhas] = bool(valor)
+        if valor:
+            quantidades = np.zeros((1, len(MATERIAIS)))
+            quantidades[:, linhas] = _produto(self._variaveis, COEFICIENTES[linhas].T)
+            self._quantidades[linhas] = arredondar_quantidades(quantidades)[0, linhas]
+        else:
+            self._quantidades[linhas] = 0.0
+        self._atualizar_custos(linhas)
+
+    def _atualizar_custos(self, linhas):
+        """
+        Recalcula o custo dos materiais `linhas` e refaz só as fases que os contêm.
+        """
+        if not len(linhas):
+            return
+        self._custos[linhas] = self._quantidades[linhas] * self._precos[linhas]
+        self._custos[_AGUA] = np.round(self._custos[_AGUA], 2)
+        for j in np.unique(_ALOC_FASE[np.isin(_ALOC_MATERIAL, linhas)]):
+            parcela = slice(_INICIO_FASE[j], _INICIO_FASE[j + 1])
+            self._fases[j] = np.add.reduce(self._custos[_ALOC_MATERIAL[parcela]] * _ALOC_FRACAO[parcela])
+
+    def resultado(self) -> ResultadoOrcamento:
+        area = float(self._variaveis[0, VARIAVEIS.index("area")])
+        return ResultadoOrcamento(
+            self._quantidades.copy(), self._custos.copy(), self._fases.copy(), self._presentes.copy(), area
+        )
+
+
+# =======================
+# CÁLCULO EM LOTE (VETORIZADO)
+# =======================
+
+def calcular_lote(
+    dados,
+    custo_unitario: Dict[str, float],
+    extras: Dict[str, float],
+    preco_agua_por_litro: float = 0.01,
+    caminhoes_enchimento: int = 3,
+    fluxo_mangueira_lph: float = 1000.0,
+    centavos: bool = False,
+    perfil: Optional[Union[str, Perfil]] = None
+) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray], Dict[str, np.ndarray], np.ndarray]:
+    """
+    Versão vetorizada de calcular_tudo para muitas piscinas de uma vez.
 
-    custos_fase = {}
-    for fase, mats in fases.items():
-        custos_fase[fase] = sum(custos.get(m, 0) for m in mats)
+    `dados` é um DataFrame ou um dict de colunas com largura, comprimento,
+    profundidade_min, profundidade_max, revestimento, hidromassagem e,
+    opcionalmente, vinilico. Para contornos que não são retângulos, troque
+    largura e comprimento pelas colunas area, perimetro e quinas
+    (geometria.medir_contornos).
+    Retorna os mesmos quatro resultados de calcular_tudo, mas cada valor é
+    um array com uma posição por piscina. Materiais ausentes numa linha
+    (revestimento ou hidromassagem não escolhidos) aparecem com 0.
+    Com `centavos=True` os custos são arrays int64 em centavos, que podem
+    ser somados em carteiras inteiras sem erro de arredondamento.
+    `perfil` ("rampa" ou (posicoes, profundidades) com uma linha por piscina)
+    liga o modelo de superfícies, como em calcular_tudo.
+    """
+    coeficientes = COEFICIENTES
+    if "area" in dados:
+        variaveis = matriz_variaveis_forma(
+            dados["area"], dados["perimetro"], dados["quinas"], dados["profundidade_min"],
+            dados["profundidade_max"], caminhoes_enchimento, fluxo_mangueira_lph
+        )
+    else:
+        variaveis, coeficientes = _variaveis_perfil(
+            dados["largura"], dados["comprimento"], dados["profundidade_min"], dados["profundidade_max"],
+            perfil, caminhoes_enchimento, fluxo_mangueira_lph
+        )
+    presentes = mascara_materiais(
+        dados["revestimento"], dados["hidromassagem"], dados["vinilico"] if "vinilico" in dados else False
+    )
+    quantidades = calcular_quantidades(variaveis, presentes, coeficientes=coeficientes)
+    precos = vetor_precos(custo_unitario, extras, preco_agua_por_litro)
+    if centavos:
+        custos_matriz = calcular_custos_centavos(quantidades, precos)
+        fases_matriz = alocar_fases_centavos(custos_matriz)
+    else:
+        custos_matriz = calcular_custos(quantidades, precos)
+        fases_matriz = alocar_fases(custos_matriz)
 
-    return materiais, custos, custos_fase, area
\ No newline at end of file
+    materiais = {mat: quantidades[:, i] for i, mat in enumerate(MATERIAIS) if mat not in SOMENTE_CUSTO}
+    custos = {mat: custos_matriz[:, i] for i, mat in enumerate(MATERIAIS)}
+    custos_fase = {fase: fases_matriz[:, j] for j, fase in enumerate(FASES)}
+    area = variaveis[:, VARIAVEIS.index("area")]
+    return materiais, custos, custos_fase, area
@@ -0,0 +1,149 @@
+# catalogo.py
+"""
+Catálogo de preços versionado.
+
+Uma tabela de preços (CSV ou XLSX com as colunas "material" e "preco") é
+lida uma vez e compilada num vetor indexado pelo id do material, o mesmo
+formato de vetor_precos. O vetor compilado fica guardado em disco como .npy
+e é aberto por memory-map nas próximas execuções, sem reler a planilha.
+
+Cada versão é imutável e identificada pelo hash do conteúdo compilado
+(preços e ordem dos materiais): resultados, relatórios e caches guardam a
+versão para saber com quais preços foram calculados.
+"""
+import csv
+import hashlib
+import os
+from typing import Dict, Optional
+
+import numpy as np
+
+from calculos import ID_MATERIAL, MATERIAIS, PRECOS_EXTRAS, SOMENTE_CUSTO
+from saidas import gravar_atomico
+
+PASTA_PRECOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "precos")
+TABELA_PADRAO = os.path.join(PASTA_PRECOS, "tabela_padrao.csv")
+PASTA_COMPILADOS = os.path.join(PASTA_PRECOS, "compilados")
+
+# Preços que calcular_tudo recebe fora de custo_unitario
+_AGUA = ID_MATERIAL["Custo de enchimento (R$)"]
+_FORA_CUSTO_UNITARIO = set(PRECOS_EXTRAS) | SOMENTE_CUSTO
+
+
+def _ler_csv(caminho: str) -> Dict[str, str]:
+    with open(caminho, newline="", encoding="utf-8-sig") as f:
+        amostra = f.read(4096)
+        f.seek(0)
+        dialeto = csv.Sniffer().sniff(amostra, delimiters=",;")
+        return {linha["material"].strip(): linha["preco"] for linha in csv.DictReader(f, dialect=dialeto)}
+
+
+def _ler_xlsx(caminho: str) -> Dict[str, str]:
+    from openpyxl import load_workbook
+
+    planilha = load_workbook(caminho, read_only=True, data_only=True).active
+    linhas = planilha.iter_rows(values_only=True)
+    cabecalho = [str(c).strip().lower() for c in next(linhas)]
+    i_material, i_preco = cabecalho.index("material"), cabecalho.index("preco")
+    return {str(linha[i_material]).strip(): linha[i_preco] for linha in linhas if linha[i_material]}
+
+
+def compilar_tabela(caminho: str) -> np.ndarray:
+    """
+    Lê a tabela e devolve o vetor de preços por id de material. Materiais
+    fora da tabela valem 0; um material desconhecido é erro (evita que um
+    nome digitado errado fique com preço 0 sem ninguém perceber).
+    """
+    if caminho.lower().endswith((".xlsx", ".xlsm")):
+        linhas = _ler_xlsx(caminho)
+    else:
+        linhas = _ler_csv(caminho)
+    desconhecidos = [m for m in linhas if m not in ID_MATERIAL]
+    if desconhecidos:
+        raise ValueError(f"Materiais desconhecidos na tabela de preços {caminho}: {', '.join(desconhecidos)}")
+    precos = np.zeros(len(MATERIAIS))
+    for material, preco in linhas.items():
+        precos[ID_MATERIAL[material]] = float(str(preco).replace(",", ".")) if preco not in (None, "") else 0.0
+    return precos
+
+
+def versao_precos(precos: np.ndarray) -> str:
+    """Hash do conteúdo compilado: mesmos preços na mesma ordem de materiais, mesma versão."""
+    h = hashlib.sha256("\n".join(MATERIAIS).encode("utf-8"))
+    h.update(np.ascontiguousarray(precos, dtype="<f8").tobytes())
+    return h.hexdigest()[:16]
+
+
+def _hash_arquivo(caminho: str) -> str:
+    with open(caminho, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+class CatalogoPrecos:
+    """
+    Uma versão imutável da tabela de preços. `precos` é o vetor por id de
+    material (somente leitura); custo_unitario e extras reproduzem os dicts
+    aceitos por calcular_tudo e calcular_projeto.
+    """
+
+    __slots__ = ("precos", "versao", "origem")
+
+    def __init__(self, precos: np.ndarray, origem: str = "", versao: Optional[str] = None):
+        if precos.shape != (len(MATERIAIS),):
+            raise ValueError(f"Vetor de preços com {precos.shape} posições; o registro tem {len(MATERIAIS)} materiais")
+        if precos.flags.writeable:
+            precos = precos.copy()
+            precos.flags.writeable = False
+        self.precos = precos
+        self.versao = versao or versao_precos(precos)
+        self.origem = origem
+
+    @property
+    def custo_unitario(self) -> Dict[str, float]:
+        return {m: float(self.precos[i]) for i, m in enumerate(MATERIAIS) if m not in _FORA_CUSTO_UNITARIO}
+
+    @property
+    def extras(self) -> Dict[str, float]:
+        return {chave: float(self.precos[ID_MATERIAL[m]]) for m, chave in PRECOS_EXTRAS.items()}
+
+    @property
+    def preco_agua_por_litro(self) -> float:
+        return float(self.precos[_AGUA])
+
+    def __repr__(self) -> str:
+        return f"CatalogoPrecos(versao={self.versao!r}, origem={self.origem!r})"
+
+
+def abrir_catalogo(caminho: str = TABELA_PADRAO, pasta_compilados: str = PASTA_COMPILADOS) -> CatalogoPrecos:
+    """
+    Catálogo da tabela em `caminho`. Na primeira vez a tabela é compilada e
+    gravada em `pasta_compilados` como <versao>.npy, com um índice
+    <hash do arquivo>.versao; depois o vetor é só aberto por memory-map.
+    Editar a tabela gera outra versão e as antigas continuam no disco
+    (abrir_versao).
+    """
+    os.makedirs(pasta_compilados, exist_ok=True)
+    indice = os.path.join(pasta_compilados, _hash_arquivo(caminho) + ".versao")
+    if os.path.exists(indice):
+        with open(indice, encoding="ascii") as f:
+            versao = f.read().strip()
+        try:
+            return abrir_versao(versao, pasta_compilados, origem=caminho)
+        except (OSError, ValueError):
+            pass  # compilado ausente ou de outro registro de materiais: recompila
+
+    precos = compilar_tabela(caminho)
+    versao = versao_precos(precos)
+    compilado = os.path.join(pasta_compilados, versao + ".npy")
+    if not os.path.exists(compilado):
+        gravar_atomico(compilado, lambda f: np.save(f, precos))
+    gravar_atomico(indice, lambda f: f.write(versao.encode("ascii")))
+    return abrir_versao(versao, pasta_compilados, origem=caminho)
+
+
+def abrir_versao(versao: str, pasta_compilados: str = PASTA_COMPILADOS, origem: str = "") -> CatalogoPrecos:
+    """Reabre uma versão já compilada (ex.: a registrada num relatório antigo)."""
+    precos = np.load(os.path.join(pasta_compilados, versao + ".npy"), mmap_mode="r")
+    if versao_precos(precos) != versao:
+        raise ValueError(f"Conteúdo do compilado {versao} não confere com a versão")
+    return CatalogoPrecos(precos, origem, versao)
@@ -0,0 +1,110 @@
+# colunar.py
+"""
+Exportação colunar (Feather ou Parquet) dos resultados de calcular_lote,
+para BI e análises que hoje leem um .xlsx por projeto.
+
+São quatro tabelas, todas com a coluna "projeto" como chave: projetos
+(colunas de entrada e área), materiais, custos e custos_fase, com uma
+coluna tipada por material ou fase. As colunas saem direto dos arrays do
+lote, sem passar por dicts por projeto.
+
+Feather é gravado sem compressão: reaberto com carregar_lote, cada coluna
+é um memory-map do arquivo e column(...).to_numpy() não copia nada, o que
+serve para reprecificar (quantidades x preços novos) lotes grandes.
+"""
+import os
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+from saidas import gravando
+
+TABELAS = ("projetos", "materiais", "custos", "custos_fase")
+_EXTENSOES = {"feather": ".feather", "parquet": ".parquet"}
+
+
+def tabelas_lote(
+    dados,
+    resultado,
+    ids: Optional[Sequence] = None,
+    centavos: bool = False,
+    versao_precos: Optional[str] = None
+) -> Dict[str, pa.Table]:
+    """
+    Tabelas Arrow de um lote: `dados` é o DataFrame/dict de colunas passado a
+    calcular_lote e `resultado` a tupla (materiais, custos, custos_fase,
+    area) que ele devolveu. `ids` identifica os projetos (padrão: a posição
+    no lote). A unidade dos custos ("reais" ou "centavos") e a versão do
+    catálogo de preços vão nos metadados das tabelas.
+    """
+    materiais, custos, custos_fase, area = resultado
+    n = len(area)
+    projeto = pa.array(np.arange(n) if ids is None else ids)
+    metadados = {"unidade_custos": "centavos" if centavos else "reais"}
+    if versao_precos:
+        metadados["versao_precos"] = versao_precos
+
+    def tabela(colunas):
+        nomes = ["projeto", *colunas]
+        return pa.table([projeto, *(pa.array(np.asarray(v)) for v in colunas.values())],
+                        names=nomes, metadata=metadados)
+
+    entradas = {k: dados[k] for k in dados}
+    entradas["area"] = area
+    return {
+        "projetos": tabela(entradas),
+        "materiais": tabela(materiais),
+        "custos": tabela(custos),
+        "custos_fase": tabela(custos_fase),
+    }
+
+
+def exportar_lote(
+    pasta: str,
+    dados,
+    resultado,
+    ids: Optional[Sequence] = None,
+    formato: str = "feather",
+    centavos: bool = False,
+    versao_precos: Optional[str] = None
+) -> Dict[str, str]:
+    """
+    Grava as tabelas de tabelas_lote em `pasta` (projetos.feather, ... ou
+    .parquet) e devolve o caminho de cada uma. Cada arquivo é gravado num
+    temporário e renomeado, então um leitor nunca pega uma tabela pela metade.
+    """
+    if formato not in _EXTENSOES:
+        raise ValueError(f"Formato '{formato}' inválido; use 'feather' ou 'parquet'")
+    os.makedirs(pasta, exist_ok=True)
+    caminhos = {}
+    for nome, tabela in tabelas_lote(dados, resultado, ids, centavos, versao_precos).items():
+        caminho = os.path.join(pasta, nome + _EXTENSOES[formato])
+        with gravando(caminho) as temporario:
+            if formato == "feather":
+                # Um só bloco: cada coluna fica contígua e to_numpy() não copia
+                feather.write_feather(tabela, temporario, compression="uncompressed",
+                                      chunksize=max(tabela.num_rows, 1))
+            else:
+                pq.write_table(tabela, temporario)
+        caminhos[nome] = caminho
+    return caminhos
+
+
+def carregar_lote(pasta: str, formato: str = "feather") -> Dict[str, pa.Table]:
+    """
+    Reabre as tabelas de exportar_lote. Em Feather a leitura é por
+    memory-map, sem cópia; Parquet precisa ser descompactado.
+    """
+    if formato not in _EXTENSOES:
+        raise ValueError(f"Formato '{formato}' inválido; use 'feather' ou 'parquet'")
+    tabelas = {}
+    for nome in TABELAS:
+        caminho = os.path.join(pasta, nome + _EXTENSOES[formato])
+        if formato == "feather":
+            tabelas[nome] = feather.read_table(caminho, memory_map=True)
+        else:
+            tabelas[nome] = pq.read_table(caminho)
+    return tabelas
@@ -0,0 +1,145 @@
+# compras.py
+"""
+Compra consolidada dos materiais de muitos projetos.
+
+Cada projeto sai de calcular_lote com quantidades fracionárias (0,57 saco de
+cimento, 187,5 blocos). Aqui as quantidades dos projetos com a mesma janela
+de entrega são somadas, arredondadas para embalagens inteiras e precificadas
+com os descontos por faixa de quantidade de cada material. A economia é
+comparada com a compra de cada projeto isolado (também em embalagens
+inteiras e com as mesmas faixas).
+
+Tudo é matricial (projetos x materiais e janelas x materiais): dezenas de
+milhares de projetos se agregam em milissegundos.
+"""
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from calculos import ID_MATERIAL, MATERIAIS
+
+# =======================
+# TABELA DE EMBALAGENS
+# =======================
+
+# material, fornecedor, embalagem (em unidades do material) e faixas de
+# desconto (embalagens mínimas no pedido, desconto sobre o preço).
+# Materiais fora da tabela (água, caminhões, tempo) não entram na compra.
+TABELA_EMBALAGENS = [
+    ("Blocos",                            "Olaria",            1,    [(1000, 0.05), (5000, 0.08)]),
+    ("Tela para Quina Vivas (caixas)",    "Impermeabilização", 1,    [(10, 0.05)]),
+    ("Impermeabilizante1 (caixas 20kg)",  "Impermeabilização", 1,    [(20, 0.05), (100, 0.10)]),
+    ("Impermeabilizante2 (caixas 20kg)",  "Impermeabilização", 1,    [(20, 0.05), (100, 0.10)]),
+    ("Cimento (sacos)",                   "Depósito",          1,    [(50, 0.04), (200, 0.07)]),
+    ("Areia (m³)",                        "Depósito",          1,    [(10, 0.05)]),
+    ("Ligmassa (litros)",                 "Depósito",          18,   [(10, 0.05)]),
+    ("Argamassa ACIII (kg)",              "Depósito",          20,   [(50, 0.05), (200, 0.08)]),
+    ("Rejunte Acrílico (sacos)",          "Revestimentos",     1,    [(20, 0.05)]),
+    ("Espaçadores (unidades)",            "Revestimentos",     100,  [(50, 0.10)]),
+    ("Revestimento (m²)",                 "Revestimentos",     2,    [(100, 0.05), (500, 0.10)]),
+    ("Hidromassagem (kit)",               "Equipamentos",      1,    [(5, 0.05)]),
+    ("Manta Vinilica (m²)",               "Revestimentos",     50,   [(10, 0.05)]),
+]
+
+_IDS = np.array([ID_MATERIAL[linha[0]] for linha in TABELA_EMBALAGENS])
+FORNECEDOR = np.array([linha[1] for linha in TABELA_EMBALAGENS], dtype=object)
+EMBALAGEM = np.array([linha[2] for linha in TABELA_EMBALAGENS], dtype=float)
+
+# Faixas como matrizes materiais x faixas (faixas a menos são completadas
+# com uma faixa inalcançável e desconto 0)
+_N_FAIXAS = max(len(linha[3]) for linha in TABELA_EMBALAGENS)
+_faixas = [linha[3] + [(np.inf, 0.0)] * (_N_FAIXAS - len(linha[3])) for linha in TABELA_EMBALAGENS]
+FAIXA_MINIMA = np.array([[minimo for minimo, _ in f] for f in _faixas], dtype=float)
+FAIXA_DESCONTO = np.array([[d for _, d in f] for f in _faixas], dtype=float)
+
+_EPS = 1e-9
+
+
+def matriz_quantidades(materiais) -> np.ndarray:
+    """
+    Quantidades projetos x materiais (na ordem de MATERIAIS) a partir do dict
+    de materiais de calcular_lote; uma matriz já pronta passa direto.
+    """
+    if not isinstance(materiais, dict):
+        return np.atleast_2d(np.asarray(materiais, dtype=float))
+    n = len(next(iter(materiais.values())))
+    return np.column_stack([np.asarray(materiais[m], dtype=float) if m in materiais else np.zeros(n)
+                            for m in MATERIAIS])
+
+
+def embalagens(quantidades: np.ndarray) -> np.ndarray:
+    """Embalagens inteiras para cobrir cada quantidade (colunas de TABELA_EMBALAGENS)."""
+    return np.ceil(quantidades / EMBALAGEM - _EPS).clip(min=0)
+
+
+def desconto(n_embalagens: np.ndarray) -> np.ndarray:
+    """Desconto da maior faixa atingida por cada pedido (colunas de TABELA_EMBALAGENS)."""
+    atingida = n_embalagens[..., None] >= FAIXA_MINIMA
+    return np.where(atingida, FAIXA_DESCONTO, 0.0).max(axis=-1)
+
+
+def custo_pedido(n_embalagens: np.ndarray, precos: np.ndarray) -> np.ndarray:
+    """Custo de cada pedido com o desconto da faixa; `precos` por unidade do material."""
+    return n_embalagens * EMBALAGEM * precos[_IDS] * (1 - desconto(n_embalagens))
+
+
+def consolidar_compras(
+    materiais,
+    precos: np.ndarray,
+    janelas: Optional[Sequence] = None
+) -> Dict:
+    """
+    Agrega as compras de um lote de projetos por janela de entrega.
+
+    `materiais` é o dict de calcular_lote (ou uma matriz projetos x
+    materiais), `precos` o vetor de vetor_precos e `janelas` a janela de
+    entrega de cada projeto (ex.: a semana; sem janelas, um pedido só).
+
+    Retorna:
+    - "janelas": as janelas distintas, em ordem;
+    - "materiais": os rótulos das colunas (materiais compráveis);
+    - "fornecedores": o fornecedor de cada coluna;
+    - "necessario", "embalagens", "comprado", "sobra": janelas x materiais,
+      em unidades do material (embalagens em número de embalagens);
+    - "desconto": fração de desconto aplicada a cada pedido;
+    - "custo": custo do pedido consolidado, janelas x materiais;
+    - "custo_isolado": soma do custo de comprar cada projeto separado;
+    - "economia": custo_isolado - custo;
+    - "por_fornecedor": {fornecedor: {"custo", "custo_isolado", "economia"}}.
+    """
+    quantidades = matriz_quantidades(materiais)[:, _IDS]
+    n = len(quantidades)
+    if janelas is None:
+        janelas = np.zeros(n, dtype=int)
+    rotulos, grupo = np.unique(np.asarray(janelas), return_inverse=True)
+
+    # Soma por janela: projetos ordenados pela janela e reduzidos por fatia
+    ordem = np.argsort(grupo, kind="stable")
+    inicios = np.searchsorted(grupo[ordem], np.arange(len(rotulos)))
+    necessario = np.add.reduceat(quantidades[ordem], inicios, axis=0)
+    isolado = np.add.reduceat(custo_pedido(embalagens(quantidades), precos)[ordem], inicios, axis=0)
+
+    n_embalagens = embalagens(necessario)
+    custo = custo_pedido(n_embalagens, precos)
+    comprado = n_embalagens * EMBALAGEM
+
+    por_fornecedor = {}
+    for fornecedor in dict.fromkeys(FORNECEDOR):
+        colunas = FORNECEDOR == fornecedor
+        total, total_isolado = float(custo[:, colunas].sum()), float(isolado[:, colunas].sum())
+        por_fornecedor[fornecedor] = {"custo": total, "custo_isolado": total_isolado,
+                                      "economia": total_isolado - total}
+    return {
+        "janelas": rotulos,
+        "materiais": [linha[0] for linha in TABELA_EMBALAGENS],
+        "fornecedores": FORNECEDOR,
+        "necessario": necessario,
+        "embalagens": n_embalagens,
+        "comprado": comprado,
+        "sobra": comprado - necessario,
+        "desconto": desconto(n_embalagens),
+        "custo": custo,
+        "custo_isolado": isolado,
+        "economia": isolado - custo,
+        "por_fornecedor": por_fornecedor,
+    }
@@ -9,8 +9,7 @@ Original file is located at
 # Após muitos aprendizados e estudos e revisões e alterações e melhorias chegamos nesse código final !
 """
 
-import math
-import os
+import io
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
@@ -18,63 +17,12 @@ from reportlab.lib.pagesizes import letter
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
-from typing import Dict, Tuple
-
-
-# =======================
-# FUNÇÕES DE CÁLCULO DE MATERIAIS
-# =======================
-
-def calcular_area(largura: float, comprimento: float) -> float:
-    return largura * comprimento
-
-
-def calcular_perimetro(largura: float, comprimento: float) -> float:
-    return 2 * (largura + comprimento)
-
-
-def calcular_blocos(area: float) -> float:
-    return area * 12.5
-
-
-def calcular_tela(perimetro: float, profundidade: float) -> float:
-    return (perimetro + 4 * profundidade) / 5
-
-
-def calcular_impermeabilizante1(area: float) -> int:
-    return math.ceil(area / 9)
-
-
-def calcular_impermeabilizante2(area: float) -> int:
-    return math.ceil(area / 4)
-
-
-def calcular_cimento(area: float) -> float:
-    return (0.013 + 0.038 + 0.14) * area / 50
-
+from typing import Dict
 
-def calcular_areia(area: float) -> float:
-    return (0.065 + 0.004 + 0.025) * area
-
-
-def calcular_ligmassa(area: float) -> float:
-    return (0.0026 + 0.05) * area
-
-
-def calcular_revestimento(area: float) -> float:
-    return area
-
-
-def calcular_argamassa(area: float) -> float:
-    return 0.45 * area
-
-
-def calcular_rejunte(area: float) -> float:
-    return 0.05 * area / 20
-
-
-def calcular_espacadores(area: float) -> float:
-    return 12 * area
+from calculos import calcular_projeto
+from catalogo import abrir_catalogo
+from saidas import Trabalho, abrir_trabalho, limpar_trabalhos
+from utils import DPI_IMPRESSAO, adicionar_aba_graficos, figura_png
 
 
 # =======================
@@ -110,86 +58,17 @@ def coletar_dados_projeto() -> Dict[str, float]:
     return dados
 
 
-# =======================
-# CÁLCULOS PRINCIPAIS
-# =======================
-
-def calcular_tudo(
-    dados_piscina: Dict[str, float],
-    custo_unitario: Dict[str, float],
-    extras: Dict[str, float],
-    preco_agua_por_litro: float = 0.01,
-    caminhos_enchimento: int = 3,
-    fluxo_mangueira_lph: float = 1000.0
-) -> Tuple[Dict[str, float], Dict[str, float], Dict[str, float], float]:
-
-    largura = dados_piscina["Largura"]
-    comprimento = dados_piscina["Comprimento"]
-    profundidade = (dados_piscina["Profundidade_min"] + dados_piscina["Profundidade_max"]) / 2
-
-    area = calcular_area(largura, comprimento)
-    perimetro = calcular_perimetro(largura, comprimento)
-
-    materiais = {
-        "Blocos": calcular_blocos(area),
-        "Tela para Quina Vivas (caixas)": calcular_tela(perimetro, profundidade),
-        "Impermeabilizante1 (caixas 20kg)": calcular_impermeabilizante1(area),
-        "Impermeabilizante2 (caixas 20kg)": calcular_impermeabilizante2(area),
-        "Cimento (sacos)": calcular_cimento(area),
-        "Areia (m³)": calcular_areia(area),
-        "Ligmassa (litros)": calcular_ligmassa(area),
-        "Argamassa ACIII (kg)": calcular_argamassa(area),
-        "Rejunte Acrílico (sacos)": calcular_rejunte(area),
-        "Espaçadores (unidades)": calcular_espacadores(area)
-    }
-
-    if dados_piscina["Usar_revestimento"] == "Revestimento":
-        materiais["Revestimento (m²)"] = calcular_revestimento(area)
-
-    if dados_piscina["Vai_hidromassagem"] == "Sim":
-        materiais["Hidromassagem (kit)"] = 1
-
-    if dados_piscina["Tipo_piscina"] == "Vinilico":
-        area_manta = (area + perimetro * profundidade) * 1.10
-        materiais["Manta Vinilica (m²)"] = round(area_manta, 3)
-
-    # Enchimento da piscina
-    volume_m3 = largura * comprimento * profundidade
-    litros = volume_m3 * 1000
-    materiais["Volume de água (L)"] = round(litros, 2)
-    materiais["Caminhões de enchimento (unidades)"] = caminhos_enchimento
-    tempo_horas = litros / (caminhos_enchimento * fluxo_mangueira_lph)
-    materiais["Tempo estimado enchimento (h)"] = round(tempo_horas, 2)
-
-    custos = {m: materiais[m] * custo_unitario.get(m, 0) for m in materiais}
-    custos["Custo de enchimento (R$)"] = round(litros * preco_agua_por_litro, 2)
-
-    if "Hidromassagem (kit)" in materiais:
-        custos["Hidromassagem (kit)"] = extras.get("custo_hidromassagem_kit", 0)
-
-    fases = {
-        "Alvenaria": ["Blocos", "Cimento (sacos)"],
-        "Impermeabilização": ["Impermeabilizante1 (caixas 20kg)", "Impermeabilizante2 (caixas 20kg)"],
-        "Chapisco/Reboco": ["Cimento (sacos)", "Areia (m³)", "Argamassa ACIII (kg)"],
-        "Revestimento": ["Revestimento (m²)", "Argamassa ACIII (kg)"],
-        "Acabamento": ["Rejunte Acrílico (sacos)", "Espaçadores (unidades)"],
-        "Enchimento": ["Custo de enchimento (R$)"]
-    }
-    if "Hidromassagem (kit)" in materiais:
-        fases["Extras"] = ["Hidromassagem (kit)"]
-
-    custos_fase = {fase: sum(custos.get(m, 0) for m in mats) for fase, mats in fases.items()}
-    return materiais, custos, custos_fase, area
-
-
 # =======================
 # GRÁFICOS
 # =======================
 
-def gerar_graficos(materiais, custos, custos_fase, area):
+def gerar_graficos(materiais, custos, custos_fase, area, dpi=DPI_IMPRESSAO) -> Dict[str, io.BytesIO]:
+    """
+    Gráficos de análise como PNGs em memória ({nome: BytesIO}).
+    """
     import seaborn as sns
     import numpy as np
-    os.makedirs("graficos", exist_ok=True)
+    graficos = {}
 
     # Paleta pastel suave
     cores = sns.color_palette("pastel")
@@ -214,8 +93,7 @@ def gerar_graficos(materiais, custos, custos_fase, area):
     plt.title("Quantidade de Materiais por m²", fontsize=13, fontweight="bold")
     plt.ylabel("Quantidade (escala logarítmica)")
     plt.tight_layout()
-    plt.savefig("graficos/quantidade_por_m2.png", dpi=200)
-    plt.close()
+    graficos["quantidade_por_m2"] = figura_png(plt.gcf(), dpi)
 
     # === Custos por fase ===
     plt.figure(figsize=(10,6))
@@ -223,8 +101,7 @@ def gerar_graficos(materiais, custos, custos_fase, area):
     plt.xlabel("Custo (R$)")
     plt.title("Distribuição de custos por fase", fontsize=13, fontweight="bold")
     plt.tight_layout()
-    plt.savefig("graficos/custos_por_fase.png", dpi=200)
-    plt.close()
+    graficos["custos_por_fase"] = figura_png(plt.gcf(), dpi)
 
     # === Custos por material ===
     plt.figure(figsize=(12,6))
@@ -233,8 +110,7 @@ def gerar_graficos(materiais, custos, custos_fase, area):
     plt.xlabel("Custo (R$)")
     plt.title("Custos por material (inclui enchimento da piscina)", fontsize=13, fontweight="bold")
     plt.tight_layout()
-    plt.savefig("graficos/custos_por_material.png", dpi=200)
-    plt.close()
+    graficos["custos_por_material"] = figura_png(plt.gcf(), dpi)
 
     # === Enchimento da Piscina (mantém o que já estava lindo) ===
     if "Custo de enchimento (R$)" in custos:
@@ -242,7 +118,7 @@ def gerar_graficos(materiais, custos, custos_fase, area):
         parametros = ["Volume (L)", "Caminhões", "Tempo (h)", "Custo (R$)"]
         valores = [
             materiais.get("Volume de água (L)", 0),
-            materiais.get("Caminhos de enchimento (unidades)", 0),
+            materiais.get("Caminhões de enchimento (unidades)", 0),
             materiais.get("Tempo estimado enchimento (h)", 0),
             custos.get("Custo de enchimento (R$)", 0)
         ]
@@ -256,25 +132,27 @@ def gerar_graficos(materiais, custos, custos_fase, area):
             ax.text(b.get_x() + b.get_width()/2, altura + (altura*0.02 if altura>0 else 0.1),
                     f"{valores[i]:,.2f}", ha="center", va="bottom", fontsize=10, color="#333")
         plt.tight_layout()
-        plt.savefig("graficos/custo_enchimento.png", dpi=200)
-        plt.close(fig)
+        graficos["custo_enchimento"] = figura_png(fig, dpi)
+
+    return graficos
 
 
 # =======================
 # RELATÓRIOS
 # =======================
 
-def salvar_excel(dados_piscina, materiais, custos, custos_fase):
-    with pd.ExcelWriter("relatorio_piscina.xlsx") as writer:
+def salvar_excel(dados_piscina, materiais, custos, custos_fase, trabalho: Trabalho, graficos=None):
+    with trabalho.gravando("relatorio_piscina.xlsx") as temporario, pd.ExcelWriter(temporario) as writer:
         pd.DataFrame([dados_piscina]).to_excel(writer, sheet_name="Dados_Projeto", index=False)
         pd.DataFrame(list(materiais.items()), columns=["Material", "Quantidade"]).to_excel(writer, sheet_name="Materiais", index=False)
         pd.DataFrame(list(custos.items()), columns=["Material", "Custo (R$)"]).to_excel(writer, sheet_name="Custos", index=False)
         pd.DataFrame(list(custos_fase.items()), columns=["Fase", "Custo (R$)"]).to_excel(writer, sheet_name="Custos_Fase", index=False)
-    print("✅ Planilha Excel gerada: relatorio_piscina.xlsx")
+        if graficos:
+            adicionar_aba_graficos(writer.book, graficos)
+    print(f"✅ Planilha Excel gerada: {trabalho.caminho('relatorio_piscina.xlsx')}")
 
 
-def gerar_pdf(dados_piscina, materiais, custos, custos_fase):
-    doc = SimpleDocTemplate("orcamento_piscina.pdf", pagesize=letter)
+def gerar_pdf(dados_piscina, materiais, custos, custos_fase, trabalho: Trabalho, graficos=None):
     styles = getSampleStyleSheet()
     story = []
 
@@ -295,7 +173,7 @@ def gerar_pdf(dados_piscina, materiais, custos, custos_fase):
     if "Volume de água (L)" in materiais:
         enchimento_data = {
             "Volume de água (L)": materiais.get("Volume de água (L)", 0),
-            "Caminhos de enchimento (unidades)": materiais.get("Caminhos de enchimento (unidades)", 0),
+            "Caminhões de enchimento (unidades)": materiais.get("Caminhões de enchimento (unidades)", 0),
             "Tempo estimado enchimento (h)": materiais.get("Tempo estimado enchimento (h)", 0),
             "Custo de enchimento (R$)": custos.get("Custo de enchimento (R$)", 0)
         }
@@ -303,17 +181,16 @@ def gerar_pdf(dados_piscina, materiais, custos, custos_fase):
 
 
     # Adiciona gráficos
-    for img_name in sorted(os.listdir("graficos")):
-        img_path = os.path.join("graficos", img_name)
-        if os.path.exists(img_path):
-            story.append(Spacer(1, 12))
-            story.append(Image(img_path, width=6*inch, height=4*inch))
+    for buffer in (graficos or {}).values():
+        story.append(Spacer(1, 12))
+        story.append(Image(io.BytesIO(buffer.getvalue()), width=6*inch, height=4*inch))
 
     story.append(Spacer(1, 12))
     story.append(Paragraph("✅ Relatório gerado automaticamente com gráficos em tons pastéis para melhor visualização.", styles['Normal']))
 
-    doc.build(story)
-    print("✅ PDF gerado: orcamento_piscina.pdf")
+    with trabalho.gravando("orcamento_piscina.pdf") as temporario:
+        SimpleDocTemplate(temporario, pagesize=letter).build(story)
+    print(f"✅ PDF gerado: {trabalho.caminho('orcamento_piscina.pdf')}")
 
 
 # =======================
@@ -321,34 +198,27 @@ def gerar_pdf(dados_piscina, materiais, custos, custos_fase):
 # =======================
 
 def main():
-    custo_unitario = {
-        "Blocos": 1.5,
-        "Tela para Quina Vivas (caixas)": 50,
-        "Impermeabilizante1 (caixas 20kg)": 100,
-        "Impermeabilizante2 (caixas 20kg)": 150,
-        "Cimento (sacos)": 25,
-        "Areia (m³)": 150,
-        "Ligmassa (litros)": 10,
-        "Revestimento (m²)": 60,
-        "Argamassa ACIII (kg)": 20,
-        "Rejunte Acrílico (sacos)": 40,
-        "Espaçadores (unidades)": 0.1
-    }
-    extras = {"custo_hidromassagem_kit": 5000}
-
-    preco_agua_por_litro = 0.01
-    caminhos_enchimento = 3
+    # Preços da tabela versionada (precos/tabela_padrao.csv)
+    catalogo = abrir_catalogo()
+    custo_unitario, extras = catalogo.custo_unitario, catalogo.extras
+
+    preco_agua_por_litro = catalogo.preco_agua_por_litro
+    caminhoes_enchimento = 3
     fluxo_mangueira_lph = 1000.0
 
     dados_piscina = coletar_dados_projeto()
-    materiais, custos, custos_fase, area = calcular_tudo(
+    dados_piscina["Versao_precos"] = catalogo.versao
+    materiais, custos, custos_fase, area = calcular_projeto(
         dados_piscina, custo_unitario, extras,
-        preco_agua_por_litro, caminhos_enchimento, fluxo_mangueira_lph
+        preco_agua_por_litro, caminhoes_enchimento, fluxo_mangueira_lph
     )
 
-    gerar_graficos(materiais, custos, custos_fase, area)
-    salvar_excel(dados_piscina, materiais, custos, custos_fase)
-    gerar_pdf(dados_piscina, materiais, custos, custos_fase)
+    graficos = gerar_graficos(materiais, custos, custos_fase, area)
+    # Cada execução grava na sua pasta; as de mais de 24 h são apagadas
+    limpar_trabalhos()
+    trabalho = abrir_trabalho()
+    salvar_excel(dados_piscina, materiais, custos, custos_fase, trabalho, graficos)
+    gerar_pdf(dados_piscina, materiais, custos, custos_fase, trabalho, graficos)
 
 
 if __name__ == "__main__":
@@ -413,8 +283,7 @@ print(f"✅ Fluxograma HD gerado com sucesso: {output_path}")
 
 """# Por fim pedi ao chat auxilio para deixar profissional além de funcional, aprimorar a leitura, organizzar os itens e dar aquela enxugada em repetições, assim ele fez:"""
 
-import math
-import os
+import io
 from dataclasses import dataclass, asdict
 from typing import Dict, Tuple
 
@@ -426,6 +295,11 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 
+from calculos import calcular_tudo
+from catalogo import abrir_catalogo
+from saidas import Trabalho, abrir_trabalho, limpar_trabalhos
+from utils import DPI_IMPRESSAO, adicionar_aba_graficos, figura_png
+
 
 # =========================
 # 🎯 ESTRUTURA DE DADOS
@@ -448,74 +322,23 @@ class ProjetoPiscina:
 # =========================
 # ⚙️ FUNÇÕES DE CÁLCULO
 # =========================
-def calcular_area(l, c): return l * c
-def calcular_perimetro(l, c): return 2 * (l + c)
-def calcular_volume(l, c, p): return l * c * p * 1000  # em litros
-
-
-def calcular_materiais(p: ProjetoPiscina) -> Dict[str, float]:
-    """Calcula todos os materiais necessários a partir dos dados do projeto."""
-    area = calcular_area(p.largura, p.comprimento)
-    perimetro = calcular_perimetro(p.largura, p.comprimento)
-    profundidade = (p.profundidade_min + p.profundidade_max) / 2
-
-    materiais = {
-        "Blocos": area * 12.5,
-        "Tela para Quina Vivas (caixas)": (perimetro + 4 * profundidade) / 5,
-        "Impermeabilizante1 (caixas 20kg)": math.ceil(area / 9),
-        "Impermeabilizante2 (caixas 20kg)": math.ceil(area / 4),
-        "Cimento (sacos)": (0.013 + 0.038 + 0.14) * area / 50,
-        "Areia (m³)": (0.065 + 0.004 + 0.025) * area,
-        "Ligmassa (litros)": (0.0026 + 0.05) * area,
-        "Argamassa ACIII (kg)": 0.45 * area,
-        "Rejunte Acrílico (sacos)": 0.05 * area / 20,
-        "Espaçadores (unidades)": 12 * area,
-    }
-
-    if p.revestimento:
-        materiais["Revestimento (m²)"] = area
-    if p.hidromassagem:
-        materiais["Hidromassagem (kit)"] = 1
-    if p.tipo.lower().startswith("v"):
-        materiais["Manta Vinilica (m²)"] = round((area + perimetro * profundidade) * 1.1, 3)
-
-    volume = calcular_volume(p.largura, p.comprimento, profundidade)
-    materiais.update({
-        "Volume de água (L)": volume,
-        "Caminhões de enchimento (unidades)": 3,
-        "Tempo estimado enchimento (h)": round(volume / (3 * 1000.0), 2)
-    })
-    return materiais
-
-
-def calcular_custos(materiais: Dict[str, float], custo_unit: Dict[str, float],
-                    extras: Dict[str, float], preco_agua_l: float) -> Tuple[Dict[str, float], Dict[str, float]]:
-    custos = {m: q * custo_unit.get(m, 0) for m, q in materiais.items()}
-    custos["Custo de enchimento (R$)"] = materiais["Volume de água (L)"] * preco_agua_l
-    if "Hidromassagem (kit)" in materiais:
-        custos["Hidromassagem (kit)"] = extras.get("custo_hidromassagem_kit", 0)
-
-    fases = {
-        "Alvenaria": ["Blocos", "Cimento (sacos)"],
-        "Impermeabilização": ["Impermeabilizante1 (caixas 20kg)", "Impermeabilizante2 (caixas 20kg)"],
-        "Chapisco/Reboco": ["Cimento (sacos)", "Areia (m³)", "Argamassa ACIII (kg)"],
-        "Revestimento": ["Revestimento (m²)", "Argamassa ACIII (kg)"],
-        "Acabamento": ["Rejunte Acrílico (sacos)", "Espaçadores (unidades)"],
-        "Enchimento": ["Custo de enchimento (R$)"],
-    }
-    if "Hidromassagem (kit)" in materiais:
-        fases["Extras"] = ["Hidromassagem (kit)"]
-
-    custos_fase = {fase: sum(custos.get(m, 0) for m in mats) for fase, mats in fases.items()}
-    return custos, custos_fase
+def calcular_orcamento(p: ProjetoPiscina, custo_unit: Dict[str, float], extras: Dict[str, float],
+                       preco_agua_l: float = 0.01) -> Tuple[Dict[str, float], Dict[str, float], Dict[str, float], float]:
+    """Materiais, custos, custos por fase e área do projeto (núcleo em calculos.py)."""
+    return tuple(calcular_tudo(
+        p.largura, p.comprimento, p.profundidade_min, p.profundidade_max,
+        p.revestimento, p.hidromassagem, custo_unit, extras,
+        vinilico=p.tipo.lower().startswith("v"), preco_agua_por_litro=preco_agua_l
+    ))
 
 
 # =========================
 # 📊 GRÁFICOS
 # =========================
-def gerar_graficos(materiais, custos, custos_fase, area):
-    os.makedirs("graficos", exist_ok=True)
+def gerar_graficos(materiais, custos, custos_fase, area, dpi=DPI_IMPRESSAO) -> Dict[str, io.BytesIO]:
+    """Gráficos como PNGs em memória ({nome: BytesIO})."""
     sns.set(style="whitegrid", palette="pastel")
+    graficos = {}
 
     # Quantidade por m²
     plt.figure(figsize=(10, 6))
@@ -525,40 +348,39 @@ def gerar_graficos(materiais, custos, custos_fase, area):
     plt.xticks(rotation=80)
     plt.title("Quantidade de Materiais por m² (escala log)")
     plt.tight_layout()
-    plt.savefig("graficos/quantidade_por_m2.png", dpi=200)
-    plt.close()
+    graficos["quantidade_por_m2"] = figura_png(plt.gcf(), dpi)
 
     # Custos por fase
     plt.figure(figsize=(8, 5))
     plt.barh(list(custos_fase.keys()), list(custos_fase.values()))
     plt.title("Distribuição de custos por fase")
     plt.tight_layout()
-    plt.savefig("graficos/custos_por_fase.png", dpi=200)
-    plt.close()
+    graficos["custos_por_fase"] = figura_png(plt.gcf(), dpi)
 
     # Custos por material
     plt.figure(figsize=(10, 6))
     plt.barh(*zip(*sorted(custos.items(), key=lambda x: x[1], reverse=True)))
     plt.title("Custos por material")
     plt.tight_layout()
-    plt.savefig("graficos/custos_por_material.png", dpi=200)
-    plt.close()
+    graficos["custos_por_material"] = figura_png(plt.gcf(), dpi)
+    return graficos
 
 
 # =========================
 # 📁 RELATÓRIOS
 # =========================
-def salvar_excel(projeto: ProjetoPiscina, materiais, custos, custos_fase):
-    with pd.ExcelWriter("relatorio_piscina.xlsx") as writer:
+def salvar_excel(projeto: ProjetoPiscina, materiais, custos, custos_fase, trabalho: Trabalho, graficos=None):
+    with trabalho.gravando("relatorio_piscina.xlsx") as temporario, pd.ExcelWriter(temporario) as writer:
         pd.DataFrame([asdict(projeto)]).to_excel(writer, sheet_name="Dados_Projeto", index=False)
         pd.DataFrame(materiais.items(), columns=["Material", "Quantidade"]).to_excel(writer, sheet_name="Materiais", index=False)
         pd.DataFrame(custos.items(), columns=["Material", "Custo (R$)"]).to_excel(writer, sheet_name="Custos", index=False)
         pd.DataFrame(custos_fase.items(), columns=["Fase", "Custo (R$)"]).to_excel(writer, sheet_name="Custos_Fase", index=False)
-    print("✅ Planilha Excel gerada: relatorio_piscina.xlsx")
+        if graficos:
+            adicionar_aba_graficos(writer.book, graficos)
+    print(f"✅ Planilha Excel gerada: {trabalho.caminho('relatorio_piscina.xlsx')}")
 
 
-def gerar_pdf(projeto: ProjetoPiscina, materiais, custos, custos_fase):
-    doc = SimpleDocTemplate("orcamento_piscina.pdf", pagesize=letter)
+def gerar_pdf(projeto: ProjetoPiscina, materiais, custos, custos_fase, trabalho: Trabalho, graficos=None):
     styles = getSampleStyleSheet()
     story = [Paragraph(f"Orçamento de Piscina - {projeto.nome}",
                        ParagraphStyle('Title', fontSize=16, alignment=1))]
@@ -574,28 +396,24 @@ def gerar_pdf(projeto: ProjetoPiscina, materiais, custos, custos_fase):
     secao("Custos", {k: f"{v:.2f}" for k, v in custos.items()})
     secao("Custos por Fase", {k: f"{v:.2f}" for k, v in custos_fase.items()})
 
-    for img in sorted(os.listdir("graficos")):
+    for buffer in (graficos or {}).values():
         story.append(Spacer(1, 10))
-        story.append(Image(os.path.join("graficos", img), width=6 * inch, height=4 * inch))
+        story.append(Image(io.BytesIO(buffer.getvalue()), width=6 * inch, height=4 * inch))
 
     story.append(Spacer(1, 12))
     story.append(Paragraph("✅ Relatório gerado automaticamente com gráficos em tons pastéis.", styles['Normal']))
-    doc.build(story)
-    print("✅ PDF gerado: orcamento_piscina.pdf")
+    with trabalho.gravando("orcamento_piscina.pdf") as temporario:
+        SimpleDocTemplate(temporario, pagesize=letter).build(story)
+    print(f"✅ PDF gerado: {trabalho.caminho('orcamento_piscina.pdf')}")
 
 
 # =========================
 # 🚀 EXECUÇÃO
 # =========================
 def main():
-    custo_unitario = {
-        "Blocos": 1.5, "Tela para Quina Vivas (caixas)": 50,
-        "Impermeabilizante1 (caixas 20kg)": 100, "Impermeabilizante2 (caixas 20kg)": 150,
-        "Cimento (sacos)": 25, "Areia (m³)": 150, "Ligmassa (litros)": 10,
-        "Revestimento (m²)": 60, "Argamassa ACIII (kg)": 20,
-        "Rejunte Acrílico (sacos)": 40, "Espaçadores (unidades)": 0.1
-    }
-    extras = {"custo_hidromassagem_kit": 5000}
+    # Preços da tabela versionada (precos/tabela_padrao.csv)
+    catalogo = abrir_catalogo()
+    custo_unitario, extras = catalogo.custo_unitario, catalogo.extras
 
     p = ProjetoPiscina(
         nome=input("Nome do projeto: "),
@@ -609,13 +427,13 @@ def main():
         revestimento=input("Usará revestimento? (s/n): ").lower() == "s"
     )
 
-    materiais = calcular_materiais(p)
-    custos, custos_fase = calcular_custos(materiais, custo_unitario, extras, preco_agua_l=0.01)
-    area = calcular_area(p.largura, p.comprimento)
+    materiais, custos, custos_fase, area = calcular_orcamento(p, custo_unitario, extras, preco_agua_l=catalogo.preco_agua_por_litro)
 
-    gerar_graficos(materiais, custos, custos_fase, area)
-    salvar_excel(p, materiais, custos, custos_fase)
-    gerar_pdf(p, materiais, custos, custos_fase)
+    graficos = gerar_graficos(materiais, custos, custos_fase, area)
+    limpar_trabalhos()
+    trabalho = abrir_trabalho()
+    salvar_excel(p, materiais, custos, custos_fase, trabalho, graficos)
+    gerar_pdf(p, materiais, custos, custos_fase, trabalho, graficos)
 
 
 if __name__ == "__main__":
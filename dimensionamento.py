@@ -0,0 +1,98 @@
+# dimensionamento.py
+from typing import Dict, Optional
+
+import numpy as np
+
+from calculos import calcular_lote
+
+
+def _dimensoes(escala: np.ndarray, proporcao: float, largura: Optional[float]):
+    if largura is not None:
+        return np.full_like(escala, largura), escala
+    return escala, escala * proporcao
+
+
+def custo_total_lote(largura, comprimento, profundidade_min, profundidade_max,
+                     usar_revestimento, hidromassagem, custo_unitario, extras) -> np.ndarray:
+    """
+    Custo total (soma dos custos por material) de cada piscina do lote.
+    """
+    largura, comprimento = np.broadcast_arrays(np.asarray(largura, dtype=float),
+                                               np.asarray(comprimento, dtype=float))
+    n = largura.shape
+    dados = {
+        "largura": largura,
+        "comprimento": comprimento,
+        "profundidade_min": np.broadcast_to(profundidade_min, n),
+        "profundidade_max": np.broadcast_to(profundidade_max, n),
+        "revestimento": np.broadcast_to(usar_revestimento, n),
+        "hidromassagem": np.broadcast_to(hidromassagem, n),
+    }
+    _, custos, _, _ = calcular_lote(dados, custo_unitario, extras)
+    return np.sum(list(custos.values()), axis=0)
+
+
+def dimensoes_maximas(
+    orcamentos,
+    custo_unitario: Dict[str, float],
+    extras: Dict[str, float],
+    profundidade_min: float,
+    profundidade_max: float,
+    usar_revestimento: bool = True,
+    hidromassagem: bool = False,
+    proporcao: float = 2.0,
+    largura: Optional[float] = None,
+    tolerancia: float = 1e-4,
+    dimensao_max: float = 100.0
+) -> Dict[str, np.ndarray]:
+    """
+    Maiores dimensões que cabem em cada orçamento ("tenho R$ 60.000, o que dá pra fazer?").
+
+    Com `largura` informada só o comprimento varia; senão a piscina cresce
+    mantendo comprimento = proporcao * largura. Todos os orçamentos são
+    resolvidos juntos por bisseção vetorizada sobre a dimensão livre.
+
+    O custo é não decrescente no tamanho, mas tem degraus (as caixas de
+    impermeabilizante são arredondadas para cima). A bisseção só usa essa
+    monotonia e sempre guarda o maior valor já testado que cabe no orçamento,
+    então o resultado nunca ultrapassa o orçamento, mesmo logo antes de um degrau.
+
+    Retorna arrays "largura", "comprimento", "area" e "custo", com NaN para
+    orçamentos que não pagam nem os custos fixos (ex.: kit de hidromassagem).
+    """
+    orcamentos = np.atleast_1d(np.asarray(orcamentos, dtype=float))
+    opcoes = (profundidade_min, profundidade_max, usar_revestimento, hidromassagem, custo_unitario, extras)
+
+    def custo(escala):
+        return custo_total_lote(*_dimensoes(escala, proporcao, largura), *opcoes)
+
+    viaveis = custo(np.zeros_like(orcamentos)) <= orcamentos
+
+    # Limite superior: dobra enquanto couber no orçamento, até dimensao_max
+    baixo = np.zeros_like(orcamentos)
+    alto = np.ones_like(orcamentos)
+    while True:
+        cabe = custo(alto) <= orcamentos
+        crescer = cabe & (alto < dimensao_max)
+        if not crescer.any():
+            break
+        baixo = np.where(crescer, alto, baixo)
+        alto = np.where(crescer, np.minimum(alto * 2, dimensao_max), alto)
+    # Quem cabe até em dimensao_max para ali
+    baixo = np.where(cabe, alto, baixo)
+
+    while np.any(alto - baixo > tolerancia):
+        meio = (baixo + alto) / 2
+        cabe = custo(meio) <= orcamentos
+        baixo = np.where(cabe, meio, baixo)
+        alto = np.where(cabe, alto, meio)
+
+    larguras, comprimentos = _dimensoes(baixo, proporcao, largura)
+    custos = custo(baixo)
+    invalido = ~viaveis
+    return {
+        "largura": np.where(invalido, np.nan, larguras),
+        "comprimento": np.where(invalido, np.nan, comprimentos),
+        "area": np.where(invalido, np.nan, larguras * comprimentos),
+        "custo": np.where(invalido, np.nan, custos),
+    }
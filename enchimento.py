@@ -0,0 +1,167 @@
+# enchimento.py
+"""
+Simulação de eventos discretos do enchimento de piscinas por caminhões-pipa.
+
+Cada caminhão sai da base cheio (tempo de carga), viaja até a obra (metade
+do tempo de ida e volta), espera uma mangueira livre, descarrega na vazão
+da mangueira e volta. As mangueiras de uma obra são divididas entre os
+caminhões que chegam: quando todas estão ocupadas, o caminhão entra na fila.
+Caminhões livres são despachados para a obra liberada mais antiga que ainda
+tem volume sem caminhão designado e que não está saturada (no máximo
+mangueiras + fila_max caminhões designados ao mesmo tempo), para não deixar
+caminhões parados na fila de uma obra enquanto outra espera.
+
+Os eventos ficam num heap (heapq) ordenado por tempo, então o custo é
+O(eventos log eventos): milhares de enchimentos por semana rodam em segundos.
+"""
+import heapq
+from collections import deque
+from typing import Dict, List, NamedTuple, Sequence
+
+import numpy as np
+
+
+class Caminhao(NamedTuple):
+    capacidade_l: float = 10_000.0
+    tempo_viagem_h: float = 1.0   # ida e volta entre a base e a obra
+    tempo_carga_h: float = 0.25   # enchimento do tanque na base
+
+
+def frota_padrao(n: int = 3, **caminhao) -> List[Caminhao]:
+    return [Caminhao(**caminhao) for _ in range(n)]
+
+
+# Tipos de evento; no mesmo instante, descargas terminam antes de novas chegadas
+_FIM_DESCARGA, _CHEGADA, _RETORNO, _LIBERACAO = range(4)
+
+
+def simular_enchimentos(
+    volumes_l: Sequence[float],
+    frota: Sequence[Caminhao],
+    vazao_mangueira_lph=1000.0,
+    mangueiras=1,
+    liberacao_h=0.0,
+    fila_max: int = 1
+) -> Dict:
+    """
+    Simula o enchimento de todas as obras com a frota dada.
+
+    `volumes_l` é o volume de cada obra (ex.: a coluna "Volume de água (L)"
+    de calcular_lote); vazão das mangueiras, número de mangueiras e instante
+    de liberação da obra (h) podem ser um valor para todas ou um por obra.
+    `fila_max` é quantos caminhões além das mangueiras podem estar designados
+    à mesma obra (a caminho ou na fila).
+
+    Retorna:
+    - "obras": por obra, inicio_h (primeira descarga), fim_h (piscina cheia),
+      entregas e espera_h (horas de caminhão na fila da obra);
+    - "entregas": linha do tempo de cada viagem (obra, caminhao, litros,
+      chegada_h, inicio_h, fim_h);
+    - "frota": por caminhão, entregas, litros, horas_ocupado e utilizacao
+      (fração do tempo simulado, até o último retorno à base, em serviço);
+    - "duracao_h": instante em que a última obra fica cheia.
+    """
+    volumes = np.asarray(volumes_l, dtype=float)
+    n = len(volumes)
+    n_mangueiras = np.broadcast_to(np.asarray(mangueiras, dtype=int), (n,))
+    liberacao = np.broadcast_to(np.asarray(liberacao_h, dtype=float), (n,))
+    # Obras em ordem de liberação; `proxima` aponta a primeira com volume pendente
+    ordem = np.argsort(liberacao, kind="stable").tolist()
+    proxima = 0
+
+    # O laço de eventos lê um valor por vez: listas do Python são mais rápidas
+    vazao = np.broadcast_to(np.asarray(vazao_mangueira_lph, dtype=float), (n,)).tolist()
+    limite = (n_mangueiras + fila_max).tolist()
+    liberacao = liberacao.tolist()
+    volumes = volumes.tolist()
+    pendente = list(volumes)            # litros ainda sem caminhão designado
+    entregue = [0.0] * n
+    designados = [0] * n                # caminhões a caminho, na fila ou descarregando
+    livres = n_mangueiras.tolist()
+    filas = [deque() for _ in range(n)]
+    obras = [{"obra": i, "volume_l": volumes[i], "liberacao_h": liberacao[i],
+              "inicio_h": None, "fim_h": None, "entregas": 0, "espera_h": 0.0} for i in range(n)]
+    frota_info = [{"caminhao": c, "entregas": 0, "litros": 0.0, "horas_ocupado": 0.0} for c in range(len(frota))]
+    entregas = []
+    ociosos = deque(range(len(frota)))
+    eventos = []
+    seq = 0
+
+    def agendar(tempo, tipo, *dados):
+        nonlocal seq
+        heapq.heappush(eventos, (tempo, tipo, seq, dados))
+        seq += 1
+
+    def despachar(agora):
+        nonlocal proxima
+        while proxima < n and pendente[ordem[proxima]] <= 0:
+            proxima += 1
+        k = proxima
+        while ociosos and k < n and liberacao[ordem[k]] <= agora:
+            obra = ordem[k]
+            if pendente[obra] <= 0 or designados[obra] >= limite[obra]:
+                k += 1
+                continue
+            c = ociosos.popleft()
+            litros = min(frota[c].capacidade_l, pendente[obra])
+            pendente[obra] -= litros
+            designados[obra] += 1
+            frota_info[c]["saida"] = agora
+            chegada = agora + frota[c].tempo_carga_h + frota[c].tempo_viagem_h / 2
+            agendar(chegada, _CHEGADA, c, obra, litros)
+
+    def descarregar(agora, c, obra, litros, chegada):
+        livres[obra] -= 1
+        fim = agora + litros / vazao[obra]
+        if obras[obra]["inicio_h"] is None:
+            obras[obra]["inicio_h"] = agora
+        obras[obra]["espera_h"] += agora - chegada
+        entregas.append({"obra": obra, "caminhao": c, "litros": litros,
+                         "chegada_h": chegada, "inicio_h": agora, "fim_h": fim})
+        agendar(fim, _FIM_DESCARGA, c, obra, litros)
+
+    for obra in range(n):
+        if volumes[obra] > 0 and liberacao[obra] > 0:
+            agendar(liberacao[obra], _LIBERACAO)
+    despachar(0.0)
+
+    agora = 0.0
+    while eventos:
+        agora, tipo, _, dados = heapq.heappop(eventos)
+        if tipo == _CHEGADA:
+            c, obra, litros = dados
+            if livres[obra] > 0:
+                descarregar(agora, c, obra, litros, agora)
+            else:
+                filas[obra].append((c, litros, agora))
+        elif tipo == _FIM_DESCARGA:
+            c, obra, litros = dados
+            livres[obra] += 1
+            designados[obra] -= 1
+            entregue[obra] += litros
+            obras[obra]["entregas"] += 1
+            frota_info[c]["entregas"] += 1
+            frota_info[c]["litros"] += litros
+            if entregue[obra] >= volumes[obra] - 1e-6:
+                obras[obra]["fim_h"] = agora
+            if filas[obra]:
+                proximo, litros_fila, chegada = filas[obra].popleft()
+                descarregar(agora, proximo, obra, litros_fila, chegada)
+            agendar(agora + frota[c].tempo_viagem_h / 2, _RETORNO, c)
+            despachar(agora)
+        elif tipo == _RETORNO:
+            c, = dados
+            frota_info[c]["horas_ocupado"] += agora - frota_info[c].pop("saida")
+            ociosos.append(c)
+            despachar(agora)
+        else:
+            despachar(agora)
+
+    for o in obras:
+        if o["volume_l"] <= 0:
+            o["inicio_h"] = o["fim_h"] = o["liberacao_h"]
+    duracao = max((o["fim_h"] for o in obras), default=0.0)
+    # Utilização sobre o horizonte até o último caminhão voltar à base
+    for info in frota_info:
+        info["utilizacao"] = info["horas_ocupado"] / agora if agora else 0.0
+    return {"obras": obras, "entregas": entregas, "frota": frota_info, "duracao_h": duracao}
@@ -0,0 +1,171 @@
+# geometria.py
+"""
+Contornos de piscina que não são retângulos: em L, feijão, com prainha...
+
+Um contorno é uma sequência de vértices (x, y) em metros, fechada
+implicitamente (o último vértice liga no primeiro). Uma terceira coluna
+opcional é o "bulge" de cada trecho, como nas polilinhas do CAD (DXF
+LWPOLYLINE): o trecho do vértice i ao i+1 é um arco com ângulo central
+4 * atan(bulge); bulge 0 é um segmento reto, bulge 1 um semicírculo, e o
+sinal diz para que lado o arco curva (positivo = anti-horário).
+
+Os contornos de um lote são empacotados em arrays planos com o início de
+cada contorno (como uma matriz esparsa por linhas), então área, perímetro e
+quinas do lote inteiro saem de poucas operações vetorizadas.
+"""
+from typing import Dict, Sequence
+
+import numpy as np
+
+from calculos import (
+    ResultadoOrcamento, calcular_lote, matriz_variaveis_forma, orcamento_variaveis, vetor_precos
+)
+
+# Mudança de direção mínima (em graus) para um vértice contar como quina viva.
+# Emendas tangentes (arco com arco, reta com arco) e vértices alinhados não contam.
+ANGULO_QUINA = 1.0
+
+
+def retangulo(largura: float, comprimento: float) -> np.ndarray:
+    return np.array([[0.0, 0.0], [largura, 0.0], [largura, comprimento], [0.0, comprimento]])
+
+
+def empacotar_contornos(contornos: Sequence) -> Dict[str, np.ndarray]:
+    """
+    Junta uma lista de contornos ((k, 2) ou (k, 3) com bulge) nos arrays
+    planos "x", "y", "bulge" e "inicio" (posição do primeiro vértice de cada
+    contorno, com o total no final). Um último vértice repetido igual ao
+    primeiro, comum nas exportações do CAD, é descartado.
+    """
+    pontos = []
+    for contorno in contornos:
+        contorno = np.asarray(contorno, dtype=float)
+        if contorno.shape[1] == 2:
+            contorno = np.column_stack([contorno, np.zeros(len(contorno))])
+        if len(contorno) > 1 and np.array_equal(contorno[0, :2], contorno[-1, :2]):
+            contorno = contorno[:-1]
+        if len(contorno) < 3 and not contorno[:, 2].any():
+            raise ValueError("Um contorno sem arcos precisa de pelo menos 3 vértices")
+        pontos.append(contorno)
+    tamanhos = np.array([len(p) for p in pontos])
+    planos = np.concatenate(pontos)
+    return {
+        "x": planos[:, 0],
+        "y": planos[:, 1],
+        "bulge": planos[:, 2],
+        "inicio": np.concatenate([[0], np.cumsum(tamanhos)]),
+    }
+
+
+def contornos_de_tabela(tabela, coluna_id: str = "id") -> Dict[str, np.ndarray]:
+    """
+    Empacota contornos vindos de uma tabela de vértices (DataFrame ou dict de
+    colunas) com as colunas `coluna_id`, "x", "y" e, opcionalmente, "bulge",
+    um vértice por linha e os vértices de cada contorno em sequência.
+    É o formato de importação em massa das exportações do CAD: não há laço
+    por contorno.
+    """
+    ids = np.asarray(tabela[coluna_id])
+    x = np.asarray(tabela["x"], dtype=float)
+    y = np.asarray(tabela["y"], dtype=float)
+    bulge = np.asarray(tabela["bulge"], dtype=float) if "bulge" in tabela else np.zeros(len(x))
+    inicio = np.concatenate([[0], np.flatnonzero(ids[1:] != ids[:-1]) + 1, [len(ids)]])
+
+    # Descarta o vértice de fechamento repetido
+    primeiro, ultimo = inicio[:-1], inicio[1:] - 1
+    repetido = (ultimo > primeiro) & (x[ultimo] == x[primeiro]) & (y[ultimo] == y[primeiro])
+    if repetido.any():
+        manter = np.ones(len(x), dtype=bool)
+        manter[ultimo[repetido]] = False
+        x, y, bulge = x[manter], y[manter], bulge[manter]
+        inicio = inicio - np.concatenate([[0], np.cumsum(repetido)])
+    return {"x": x, "y": y, "bulge": bulge, "inicio": inicio}
+
+
+def medir_contornos(contornos) -> Dict[str, np.ndarray]:
+    """
+    Área (m²), perímetro (m), número de vértices e número de quinas vivas de
+    cada contorno de um lote (lista de contornos ou o resultado de
+    empacotar_contornos / contornos_de_tabela).
+
+    A área é a fórmula do laço (shoelace) sobre as cordas mais a área do
+    segmento circular de cada arco; o perímetro soma cordas e comprimentos de
+    arco. As quinas alimentam a tela de quina viva (calcular_tela).
+    """
+    if not isinstance(contornos, dict):
+        contornos = empacotar_contornos(contornos)
+    x, y, bulge, inicio = contornos["x"], contornos["y"], contornos["bulge"], contornos["inicio"]
+    vertices = np.diff(inicio)
+
+    # Próximo vértice de cada vértice, fechando cada contorno no seu primeiro
+    proximo = np.arange(1, len(x) + 1)
+    proximo[inicio[1:] - 1] = inicio[:-1]
+    dx = x[proximo] - x
+    dy = y[proximo] - y
+    corda = np.hypot(dx, dy)
+
+    # Arcos: ângulo central theta = 4 atan(bulge)
+    theta = 4 * np.arctan(bulge)
+    meio_seno = np.sin(theta / 2)
+    reto = bulge == 0
+    seguro = np.where(reto, 1.0, meio_seno)
+    comprimento = np.where(reto, corda, corda * (theta / 2) / seguro)
+    segmento = np.where(reto, 0.0, corda ** 2 * (theta - np.sin(theta)) / (8 * seguro ** 2))
+
+    # Área com sinal: positiva para contornos anti-horários
+    parcelas = x * y[proximo] - x[proximo] * y
+    area = np.add.reduceat(parcelas / 2 + segmento, inicio[:-1])
+    perimetro = np.add.reduceat(comprimento, inicio[:-1])
+
+    # Quina viva: a tangente que chega ao vértice e a que sai dele diferem.
+    # No arco, a tangente de saída é a corda girada de -theta/2 e a de
+    # chegada no fim, girada de +theta/2.
+    direcao = np.arctan2(dy, dx)
+    saida = direcao - theta / 2
+    chegada = direcao + theta / 2
+    anterior = np.empty_like(proximo)
+    anterior[proximo] = np.arange(len(x))
+    giro = np.angle(np.exp(1j * (saida - chegada[anterior])))
+    quina = np.abs(giro) > np.radians(ANGULO_QUINA)
+    quinas = np.add.reduceat(quina.astype(int), inicio[:-1])
+
+    return {"area": np.abs(area), "perimetro": perimetro, "vertices": vertices, "quinas": quinas}
+
+
+def calcular_contorno(
+    contorno,
+    profundidade_min: float,
+    profundidade_max: float,
+    usar_revestimento: bool,
+    hidromassagem: bool,
+    custo_unitario: Dict[str, float],
+    extras: Dict[str, float],
+    vinilico: bool = False,
+    preco_agua_por_litro: float = 0.01,
+    caminhoes_enchimento: int = 3,
+    fluxo_mangueira_lph: float = 1000.0,
+    centavos: bool = False
+) -> ResultadoOrcamento:
+    """
+    calcular_tudo para uma piscina de contorno qualquer.
+    """
+    medidas = medir_contornos([contorno])
+    variaveis = matriz_variaveis_forma(
+        medidas["area"], medidas["perimetro"], medidas["quinas"], profundidade_min, profundidade_max,
+        caminhoes_enchimento, fluxo_mangueira_lph
+    )
+    return orcamento_variaveis(variaveis, usar_revestimento, hidromassagem, vinilico,
+                               vetor_precos(custo_unitario, extras, preco_agua_por_litro), centavos)
+
+
+def calcular_lote_contornos(contornos, dados, custo_unitario: Dict[str, float], extras: Dict[str, float], **opcoes):
+    """
+    calcular_lote para um lote de contornos: `dados` traz as mesmas colunas
+    de calcular_lote, menos largura e comprimento (uma linha por contorno).
+    """
+    medidas = medir_contornos(contornos)
+    colunas = {k: dados[k] for k in ("profundidade_min", "profundidade_max", "revestimento", "hidromassagem")}
+    if "vinilico" in dados:
+        colunas["vinilico"] = dados["vinilico"]
+    colunas.update(area=medidas["area"], perimetro=medidas["perimetro"], quinas=medidas["quinas"])
+    return calcular_lote(colunas, custo_unitario, extras, **opcoes)
@@ -0,0 +1,110 @@
+# graficos_vetoriais.py
+"""
+Gráficos do orçamento desenhados direto com reportlab.graphics.
+
+A alternativa ao matplotlib para os PDFs: cada gráfico é um Drawing
+vetorial, que entra no PDF como flowable (sem PNG, sem figura e sem
+tight_layout) e ocupa poucos KB. O matplotlib continua sendo usado no
+Streamlit e para exportar PNGs (utils.gerar_graficos).
+"""
+from typing import Dict
+
+import numpy as np
+from reportlab.graphics.charts.barcharts import HorizontalBarChart
+from reportlab.graphics.shapes import Drawing, Rect, String
+from reportlab.lib import colors
+from reportlab.lib.units import inch
+
+from calculos import FASES, ID_MATERIAL, ROTULOS, ResultadoOrcamento
+
+LARGURA = 6 * inch
+ALTURA_LINHA = 18     # pt por barra
+MARGEM_ROTULOS = 170  # pt à esquerda para os rótulos das barras
+
+# Paleta pastel, a mesma família de cores dos gráficos do app
+AZUL = colors.HexColor("#9BBFE0")
+VERDE = colors.HexColor("#8DE5A1")
+CORES_ENCHIMENTO = [colors.HexColor(c) for c in ("#A8DADC", "#F6BD60", "#BDB2FF", "#FFADAD")]
+
+
+def _barras(titulo: str, rotulos, valores, cor) -> Drawing:
+    """Barras horizontais com o valor em R$ na ponta; o primeiro rótulo fica no topo."""
+    n = len(valores)
+    altura = n * ALTURA_LINHA + 50
+    desenho = Drawing(LARGURA, altura)
+    desenho.add(String(LARGURA / 2, altura - 14, titulo, fontName="Helvetica-Bold", fontSize=11,
+                       textAnchor="middle"))
+
+    grafico = HorizontalBarChart()
+    grafico.x, grafico.y = MARGEM_ROTULOS, 20
+    grafico.width, grafico.height = LARGURA - MARGEM_ROTULOS - 60, n * ALTURA_LINHA
+    grafico.data = [list(valores[::-1])]
+    grafico.categoryAxis.categoryNames = list(rotulos[::-1])
+    grafico.categoryAxis.labels.fontSize = 7
+    grafico.categoryAxis.labels.boxAnchor = "e"
+    grafico.valueAxis.valueMin = 0
+    grafico.valueAxis.labels.fontSize = 7
+    grafico.valueAxis.labelTextFormat = lambda v: f"{v:,.0f}"
+    grafico.bars[0].fillColor = cor
+    grafico.bars[0].strokeColor = None
+    grafico.barLabelFormat = lambda v: f"R$ {v:,.2f}"
+    grafico.barLabels.fontSize = 6
+    grafico.barLabels.boxAnchor = "w"
+    grafico.barLabels.dx = 3
+    desenho.add(grafico)
+    return desenho
+
+
+def grafico_custos_fase(resultado: ResultadoOrcamento) -> Drawing:
+    escala = 100 if resultado.centavos else 1
+    ids = resultado.ids_fases
+    return _barras("Custos por fase (R$)", [FASES[j] for j in ids],
+                   (resultado.custos_fases[ids] / escala).tolist(), AZUL)
+
+
+def grafico_ranking_materiais(resultado: ResultadoOrcamento, n: int = 10) -> Drawing:
+    escala = 100 if resultado.centavos else 1
+    ids = resultado.ids_custos
+    custos = resultado.custos_materiais[ids] / escala
+    ordem = np.argsort(-custos, kind="stable")[:n]
+    return _barras(f"Top {len(ordem)} custos por material (R$)", ROTULOS[ids[ordem]].tolist(),
+                   custos[ordem].tolist(), VERDE)
+
+
+def grafico_enchimento(resultado: ResultadoOrcamento) -> Drawing:
+    """
+    Resumo do enchimento em quatro quadros (volume, caminhões, tempo e
+    custo): grandezas de escalas diferentes não cabem num mesmo eixo.
+    """
+    escala = 100 if resultado.centavos else 1
+    q = resultado.quantidades
+    itens = [
+        ("Volume (L)", f"{q[ID_MATERIAL['Volume de água (L)']]:,.0f}"),
+        ("Caminhões", f"{q[ID_MATERIAL['Caminhões de enchimento (unidades)']]:,.0f}"),
+        ("Tempo (h)", f"{q[ID_MATERIAL['Tempo estimado enchimento (h)']]:,.2f}"),
+        ("Custo (R$)", f"{resultado.custos_materiais[ID_MATERIAL['Custo de enchimento (R$)']] / escala:,.2f}"),
+    ]
+    altura = 90
+    desenho = Drawing(LARGURA, altura)
+    desenho.add(String(LARGURA / 2, altura - 14, "Enchimento da piscina", fontName="Helvetica-Bold",
+                       fontSize=11, textAnchor="middle"))
+    largura_quadro = (LARGURA - 3 * 10) / 4
+    for i, ((rotulo, valor), cor) in enumerate(zip(itens, CORES_ENCHIMENTO)):
+        x = i * (largura_quadro + 10)
+        desenho.add(Rect(x, 5, largura_quadro, 60, fillColor=cor, strokeColor=None, rx=4, ry=4))
+        desenho.add(String(x + largura_quadro / 2, 38, valor, fontName="Helvetica-Bold", fontSize=13,
+                           textAnchor="middle"))
+        desenho.add(String(x + largura_quadro / 2, 16, rotulo, fontSize=8, textAnchor="middle"))
+    return desenho
+
+
+def gerar_graficos_vetoriais(resultado: ResultadoOrcamento) -> Dict[str, Drawing]:
+    """
+    Os gráficos do PDF como Drawings, no formato de utils.gerar_graficos
+    ({nome: gráfico}): podem ser passados como `graficos` a gerar_pdf.
+    """
+    return {
+        "custo_por_fase": grafico_custos_fase(resultado),
+        "custo_por_material": grafico_ranking_materiais(resultado),
+        "enchimento": grafico_enchimento(resultado),
+    }
@@ -0,0 +1,148 @@
+# manta.py
+"""
+Encaixe da manta vinílica em rolos de largura fixa.
+
+Os painéis de cada piscina (fundo e quatro paredes) são cortados em faixas
+da largura do rolo, com sobreposição para a solda em cada emenda, e as
+faixas são encaixadas no rolo pela heurística de prateleiras FFDH (First
+Fit Decreasing Height): faixas em ordem decrescente de comprimento, cada
+uma na primeira prateleira onde cabe na largura; se não couber, abre uma
+prateleira nova. O comprimento de rolo gasto é a soma das prateleiras.
+
+Tudo é vetorizado sobre o lote: o laço é só sobre as faixas (poucas
+dezenas), e cada passo encaixa a faixa k de todas as piscinas de uma vez.
+"""
+from typing import Dict
+
+import numpy as np
+
+from superficies import calcular_superficies
+
+LARGURA_ROLO = 2.0          # m
+COMPRIMENTO_ROLO = 25.0     # m por rolo comprado
+SOBREPOSICAO_SOLDA = 0.05   # m de sobreposição em cada emenda
+_EPS = 1e-9
+
+
+def paineis_piscina(largura, comprimento, profundidade_min, profundidade_max):
+    """
+    Painéis retangulares (lado_a, lado_b), cada um (piscinas x 5), e a área
+    útil de manta (fundo sobre a rampa + paredes) de cada piscina. As paredes
+    laterais de fundo em declive são trapézios cortados de um retângulo com
+    a profundidade máxima; o recorte entra na perda.
+    """
+    largura = np.atleast_1d(np.asarray(largura, dtype=float))
+    comprimento = np.atleast_1d(np.asarray(comprimento, dtype=float))
+    pmin = np.broadcast_to(np.asarray(profundidade_min, dtype=float), largura.shape)
+    pmax = np.broadcast_to(np.asarray(profundidade_max, dtype=float), largura.shape)
+    sup = calcular_superficies(largura, comprimento, np.array([0.0, 1.0]), np.column_stack([pmin, pmax]))
+    fundo = sup["fundo"] / largura  # comprimento do fundo medido sobre a rampa
+    lado_a = np.column_stack([largura, largura, largura, comprimento, comprimento])
+    lado_b = np.column_stack([fundo, pmin, pmax, pmax, pmax])
+    return lado_a, lado_b, sup["molhada"]
+
+
+def _faixas(lado_a, lado_b, largura_rolo, sobreposicao):
+    """
+    Corta cada painel em faixas da largura do rolo na orientação que gasta
+    menos rolo (em empate, a de menos emendas). Retorna larguras e
+    comprimentos das faixas (piscinas x faixas, zeros completam) e o número
+    de emendas por piscina.
+    """
+    util = largura_rolo - sobreposicao
+
+    def n_faixas(lado):
+        return np.maximum(np.ceil((lado - sobreposicao - _EPS) / util), 1)
+
+    k_a, k_b = n_faixas(lado_a), n_faixas(lado_b)
+    gasto_a, gasto_b = k_a * lado_b, k_b * lado_a
+    usar_a = (gasto_a < gasto_b) | ((gasto_a == gasto_b) & (k_a <= k_b))
+    atravessado = np.where(usar_a, lado_a, lado_b)  # dimensão na largura do rolo
+    ao_longo = np.where(usar_a, lado_b, lado_a)
+    k = np.where(usar_a, k_a, k_b).astype(int)
+
+    maximo = int(k.max())
+    j = np.arange(maximo)[None, None, :]
+    ultima = (atravessado - (k - 1) * util)[..., None]
+    larguras = np.where(j < k[..., None] - 1, largura_rolo, np.where(j == k[..., None] - 1, ultima, 0.0))
+    comprimentos = np.where(j < k[..., None], ao_longo[..., None], 0.0)
+    n = lado_a.shape[0]
+    return larguras.reshape(n, -1), comprimentos.reshape(n, -1), (k - 1).sum(axis=1)
+
+
+def encaixar_manta(
+    largura,
+    comprimento,
+    profundidade_min,
+    profundidade_max,
+    largura_rolo: float = LARGURA_ROLO,
+    sobreposicao: float = SOBREPOSICAO_SOLDA
+) -> Dict[str, np.ndarray]:
+    """
+    Plano de corte da manta de um lote de piscinas (escalares ou arrays).
+    Retorna arrays com uma posição por piscina:
+    "comprimento_rolo" (m de rolo), "emendas", "area_rolo" e "area_util" (m²),
+    "perda_pct" (rolo que não vira manta instalada, incluindo sobreposições
+    e recortes) e "prateleiras" (comprimento de cada prateleira, piscinas x
+    prateleiras, zeros completam), usado por consolidar_rolos.
+    """
+    lado_a, lado_b, area_util = paineis_piscina(largura, comprimento, profundidade_min, profundidade_max)
+    larguras, comprimentos, emendas = _faixas(lado_a, lado_b, largura_rolo, sobreposicao)
+
+    ordem = np.argsort(-comprimentos, axis=1, kind="stable")
+    larguras = np.take_along_axis(larguras, ordem, axis=1)
+    comprimentos = np.take_along_axis(comprimentos, ordem, axis=1)
+
+    n, k = larguras.shape
+    livre = np.zeros((n, k))       # largura livre de cada prateleira
+    prateleiras = np.zeros((n, k))  # comprimento de cada prateleira
+    abertas = np.zeros(n, dtype=int)
+    linhas = np.arange(n)
+    for f in range(k):
+        w, c = larguras[:, f], comprimentos[:, f]
+        ativa = w > 0
+        cabe = (livre >= w[:, None] - _EPS) & (np.arange(k)[None, :] < abertas[:, None])
+        existe = cabe.any(axis=1)
+        destino = np.where(existe, cabe.argmax(axis=1), abertas)
+        nova = ativa & ~existe
+        prateleiras[linhas[nova], abertas[nova]] = c[nova]
+        livre[linhas[nova], abertas[nova]] = largura_rolo
+        abertas += nova
+        livre[linhas[ativa], destino[ativa]] -= w[ativa]
+
+    comprimento_rolo = prateleiras.sum(axis=1)
+    area_rolo = comprimento_rolo * largura_rolo
+    return {
+        "comprimento_rolo": comprimento_rolo,
+        "emendas": emendas,
+        "area_rolo": area_rolo,
+        "area_util": area_util,
+        "perda_pct": 100 * (1 - area_util / area_rolo),
+        "prateleiras": prateleiras[:, :max(int(abertas.max()), 1)],
+    }
+
+
+def consolidar_rolos(plano: Dict[str, np.ndarray], comprimento_rolo: float = COMPRIMENTO_ROLO) -> Dict[str, float]:
+    """
+    Pedido consolidado de rolos para o lote de encaixar_manta: as prateleiras
+    de todas as piscinas são distribuídas nos rolos por First Fit Decreasing
+    (uma prateleira não é dividida entre dois rolos).
+    Retorna "rolos", "metros_cortados" e "sobra_m" (ponta de rolo que sobra).
+    """
+    pedacos = np.sort(plano["prateleiras"][plano["prateleiras"] > 0])[::-1]
+    if len(pedacos) and pedacos[0] > comprimento_rolo + _EPS:
+        raise ValueError(f"Prateleira de {pedacos[0]:.2f} m maior que o rolo de {comprimento_rolo} m")
+    restante = np.zeros(len(pedacos))
+    usados = 0
+    for p in pedacos:
+        cabe = np.flatnonzero(restante[:usados] >= p - _EPS)
+        if len(cabe):
+            restante[cabe[0]] -= p
+        else:
+            restante[usados] = comprimento_rolo - p
+            usados += 1
+    return {
+        "rolos": usados,
+        "metros_cortados": float(pedacos.sum()),
+        "sobra_m": float(restante[:usados].sum()),
+    }
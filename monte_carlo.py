@@ -0,0 +1,125 @@
+# monte_carlo.py
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from calculos import (
+    FASES, ID_MATERIAL, MATERIAIS, alocar_fases, arredondar_quantidades, calcular_custos,
+    calcular_quantidades, mascara_materiais, matriz_variaveis, vetor_precos
+)
+
+# Distribuições aceitas, no formato (tipo, parâmetros...):
+#   ("normal", media, desvio)
+#   ("lognormal", media_do_log, desvio_do_log)
+#   ("triangular", minimo, moda, maximo)
+#   ("uniforme", minimo, maximo)
+Distribuicao = Tuple
+
+
+def _amostrar(rng: np.random.Generator, distribuicao: Distribuicao, n: int) -> np.ndarray:
+    tipo, *parametros = distribuicao
+    if tipo == "normal":
+        return rng.normal(*parametros, n)
+    if tipo == "lognormal":
+        return rng.lognormal(*parametros, n)
+    if tipo == "triangular":
+        return rng.triangular(*parametros, n)
+    if tipo == "uniforme":
+        return rng.uniform(*parametros, n)
+    raise ValueError(f"Distribuição desconhecida: {tipo}")
+
+
+def _simular_bloco(args) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sorteia um bloco de amostras e devolve (custos por fase, total) de cada amostra,
+    com as fases nas linhas.
+    Fica no nível do módulo para poder ser enviado a outros processos.
+    """
+    semente, n, quantidades, precos, distribuicoes_preco, distribuicoes_perda = args
+    rng = np.random.default_rng(semente)
+
+    # Layout materiais x amostras: cada sorteio preenche uma linha contígua
+    fatores = np.ones((len(MATERIAIS), n))
+    for i, dist in distribuicoes_perda.items():
+        fatores[i] = _amostrar(rng, dist, n)
+    amostras_preco = np.repeat(precos[:, None], n, axis=1)
+    for i, dist in distribuicoes_preco.items():
+        amostras_preco[i] = np.maximum(_amostrar(rng, dist, n), 0.0)
+
+    # A perda incide sobre a quantidade bruta; caixas inteiras são arredondadas depois
+    custos = calcular_custos(arredondar_quantidades((quantidades[:, None] * fatores).T),
+                             amostras_preco.T).T
+    return alocar_fases(custos, eixo=0), custos.sum(axis=0)
+
+
+def simular_orcamento(
+    largura: float,
+    comprimento: float,
+    profundidade_min: float,
+    profundidade_max: float,
+    usar_revestimento: bool,
+    hidromassagem: bool,
+    custo_unitario: Dict[str, float],
+    extras: Dict[str, float],
+    distribuicoes_preco: Optional[Dict[str, Distribuicao]] = None,
+    distribuicoes_perda: Optional[Dict[str, Distribuicao]] = None,
+    n_amostras: int = 100_000,
+    semente: Optional[int] = None,
+    processos: int = 1,
+    percentis: Sequence[float] = (50, 90),
+    tamanho_bloco: int = 250_000,
+    vinilico: bool = False
+) -> Dict[str, Dict]:
+    """
+    Simulação de Monte Carlo do orçamento de uma piscina.
+
+    `distribuicoes_preco` dá a distribuição do preço unitário de cada material
+    (materiais ausentes ficam com o preço de custo_unitario/extras) e
+    `distribuicoes_perda` a do fator de perda aplicado à quantidade
+    (ex.: ("triangular", 1.0, 1.05, 1.15)); sem distribuição o fator é 1.
+
+    O resultado só depende de `semente`, não de `processos`: cada bloco de
+    amostras tem sua própria semente derivada. Retorna
+    {"custos_fase": {fase: {"P50": ..., "P90": ...}}, "total": {"P50": ..., "P90": ...}}.
+    """
+    distribuicoes_preco = distribuicoes_preco or {}
+    distribuicoes_perda = distribuicoes_perda or {}
+    for mat in (*distribuicoes_preco, *distribuicoes_perda):
+        if mat not in ID_MATERIAL:
+            raise ValueError(f"Material desconhecido: {mat}")
+
+    variaveis = matriz_variaveis(largura, comprimento, profundidade_min, profundidade_max)
+    presentes = mascara_materiais(usar_revestimento, hidromassagem, vinilico)
+    quantidades = calcular_quantidades(variaveis, presentes, arredondar=False)[0]
+    precos = vetor_precos(custo_unitario, extras)
+
+    tamanhos = [min(tamanho_bloco, n_amostras - i) for i in range(0, n_amostras, tamanho_bloco)]
+    sementes = np.random.SeedSequence(semente).spawn(len(tamanhos))
+    tarefas = [
+        (s, n, quantidades, precos,
+         {ID_MATERIAL[m]: d for m, d in distribuicoes_preco.items()},
+         {ID_MATERIAL[m]: d for m, d in distribuicoes_perda.items()})
+        for s, n in zip(sementes, tamanhos)
+    ]
+
+    if processos > 1 and len(tarefas) > 1:
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            blocos = list(executor.map(_simular_bloco, tarefas))
+    else:
+        blocos = [_simular_bloco(t) for t in tarefas]
+
+    fases = np.concatenate([b[0] for b in blocos], axis=1)  # fases x amostras
+    totais = np.concatenate([b[1] for b in blocos])
+
+    rotulos = [f"P{p:g}" for p in percentis]
+    valores_fase = np.percentile(fases, percentis, axis=1)  # percentis x fases
+    valores_total = np.percentile(totais, percentis)
+
+    custos_fase = {
+        fase: {r: float(v) for r, v in zip(rotulos, valores_fase[:, j])}
+        for j, fase in enumerate(FASES)
+        if fase != "Extras" or hidromassagem
+    }
+    total = {r: float(v) for r, v in zip(rotulos, valores_total)}
+    return {"custos_fase": custos_fase, "total": total}
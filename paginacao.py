@@ -0,0 +1,199 @@
+# paginacao.py
+"""
+Paginação do revestimento: quantas peças inteiras, quantos cortes, quantas
+sobras reaproveitáveis e quanto se perde em cada superfície da piscina,
+escolhendo a origem da grade que minimiza os cortes.
+
+Cada superfície é tratada como um retângulo. A grade tem módulo
+peça + junta em cada direção; a origem desloca a grade dentro de um módulo.
+Os eixos são independentes, então cada eixo avalia todas as origens
+candidatas de uma vez e a combinação dos dois é uma tabela (origens x
+origens) resolvida com um argmin.
+"""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from superficies import calcular_superficies, perfil_rampa
+
+# Passo (m) das origens candidatas da grade em cada direção
+PASSO_ORIGEM = 0.005
+# Menor largura (m) de sobra de corte que ainda serve para outra peça
+SOBRA_MINIMA = 0.05
+_EPS = 1e-9
+
+
+def _eixo(comprimento: float, modulo: float, passo: float):
+    """
+    Para cada origem candidata de um eixo: peças inteiras, larguras das
+    peças cortadas no início e no fim (0 = sem corte) e as origens.
+    """
+    resto = comprimento % modulo
+    origens = np.unique(np.concatenate([
+        np.arange(0.0, modulo, passo),
+        [resto, (resto + modulo) / 2 % modulo, resto / 2],
+    ]))
+    inicio = np.minimum(origens, comprimento)
+    restante = comprimento - inicio
+    inteiras = np.floor((restante + _EPS) / modulo)
+    fim = restante - inteiras * modulo
+    inicio = np.where(inicio > _EPS, inicio, 0.0)
+    fim = np.where(fim > _EPS, fim, 0.0)
+    return inteiras, inicio, fim, origens
+
+
+def _por_peca(largura, modulo):
+    """Quantas peças de `largura` saem de uma peça inteira (0 quando não há corte)."""
+    return np.floor((modulo + _EPS) / np.where(largura > 0, largura, modulo))
+
+
+def _faixas(n, a, b, modulo):
+    """
+    Peças cortadas para as duas faixas de borda de um eixo (larguras a e b,
+    n peças em cada) e a sobra de cada peça cortada. Se a + b cabe numa
+    peça, a sobra do corte a é usada para o corte b.
+    """
+    tem_a, tem_b = a > 0, b > 0
+    par = tem_a & tem_b & (a + b <= modulo + _EPS)
+    por_par = _por_peca(a + b, modulo)
+    pecas_par = np.ceil(n / np.maximum(por_par, 1))
+    por_a, por_b = _por_peca(a, modulo), _por_peca(b, modulo)
+    pecas_a = np.where(tem_a, np.ceil(n / np.maximum(por_a, 1)), 0)
+    pecas_b = np.where(tem_b, np.ceil(n / np.maximum(por_b, 1)), 0)
+    pecas = np.where(par, pecas_par, pecas_a + pecas_b)
+
+    sobra_par = modulo - por_par * (a + b)
+    sobra_a, sobra_b = modulo - por_a * a, modulo - por_b * b
+    sobras = np.where(
+        par,
+        pecas_par * (sobra_par >= SOBRA_MINIMA),
+        pecas_a * (sobra_a >= SOBRA_MINIMA) * tem_a + pecas_b * (sobra_b >= SOBRA_MINIMA) * tem_b,
+    )
+    return pecas, sobras
+
+
+def _paginar(largura, altura, peca_x, peca_y, junta, passo):
+    mx, my = peca_x + junta, peca_y + junta
+    ix, ax, bx, ox = _eixo(largura, mx, passo)
+    iy, ay, by, oy = _eixo(altura, my, passo)
+    px = (ax > 0).astype(float) + (bx > 0)
+    py = (ay > 0).astype(float) + (by > 0)
+
+    # Tabelas origens_x x origens_y
+    inteiras = ix[:, None] * iy[None, :]
+    cortes = (ix + px)[:, None] * (iy + py)[None, :] - inteiras
+
+    # Faixas de borda: cortes em x ao longo das fileiras inteiras em y, e vice-versa
+    pecas_x, sobras_x = _faixas(iy[None, :], ax[:, None], bx[:, None], mx)
+    pecas_y, sobras_y = _faixas(ix[:, None], ay[None, :], by[None, :], my)
+    cantos = px[:, None] * py[None, :]
+    pecas = inteiras + pecas_x + pecas_y + cantos
+
+    # Menor corte (evita tiras finas no desempate)
+    menor_x = np.minimum(np.where(ax > 0, ax, mx), np.where(bx > 0, bx, mx))
+    menor_y = np.minimum(np.where(ay > 0, ay, my), np.where(by > 0, by, my))
+    menor = np.minimum(menor_x[:, None], menor_y[None, :])
+    ordem = np.lexsort((-menor.ravel(), pecas.ravel(), cortes.ravel()))
+    i, j = np.unravel_index(ordem[0], inteiras.shape)
+
+    area_peca = peca_x * peca_y
+    coberta = largura * altura * area_peca / (mx * my)
+    return {
+        "origem": (float(ox[i]), float(oy[j])),
+        "inteiras": int(inteiras[i, j]),
+        "cortes": int(cortes[i, j]),
+        "pecas": int(pecas[i, j]),
+        "sobras_reaproveitaveis": int(sobras_x[i, j] + sobras_y[i, j]),
+        "perda_pct": float(100 * (1 - coberta / (pecas[i, j] * area_peca))) if pecas[i, j] else 0.0,
+    }
+
+
+def paginar_superficie(
+    largura: float,
+    altura: float,
+    peca_largura: float,
+    peca_altura: float,
+    junta: float = 0.0,
+    passo: float = PASSO_ORIGEM
+) -> Dict:
+    """
+    Melhor paginação de uma superfície retangular, testando as duas
+    orientações da peça. Critério: menos cortes, depois menos peças, depois
+    o maior corte mínimo (sem tiras finas).
+    Retorna origem (m), inteiras, cortes, pecas (total a comprar),
+    sobras_reaproveitaveis, perda_pct e a orientação ("normal" ou "girada").
+    """
+    normal = _paginar(largura, altura, peca_largura, peca_altura, junta, passo)
+    if peca_largura == peca_altura:
+        return {**normal, "orientacao": "normal"}
+    girada = _paginar(largura, altura, peca_altura, peca_largura, junta, passo)
+    if (girada["cortes"], girada["pecas"]) < (normal["cortes"], normal["pecas"]):
+        return {**girada, "orientacao": "girada"}
+    return {**normal, "orientacao": "normal"}
+
+
+def superficies_revestidas(
+    largura: float,
+    comprimento: float,
+    profundidade_min: float,
+    profundidade_max: float
+) -> List[Tuple[str, float, float]]:
+    """
+    Superfícies revestidas como retângulos (nome, largura, altura). O fundo
+    usa o comprimento medido sobre a rampa; as paredes laterais de uma
+    piscina em declive (trapézios) entram com a profundidade média.
+    """
+    sup = calcular_superficies(largura, comprimento, *perfil_rampa(profundidade_min, profundidade_max))
+    fundo = float(sup["fundo"][0]) / largura
+    media = (profundidade_min + profundidade_max) / 2
+    return [
+        ("Fundo", largura, fundo),
+        ("Parede rasa", largura, profundidade_min),
+        ("Parede funda", largura, profundidade_max),
+        ("Parede lateral 1", comprimento, media),
+        ("Parede lateral 2", comprimento, media),
+    ]
+
+
+def paginar_piscina(
+    largura: float,
+    comprimento: float,
+    profundidade_min: float,
+    profundidade_max: float,
+    peca_largura: float,
+    peca_altura: float,
+    junta: float = 0.0
+) -> Dict[str, Dict]:
+    """
+    Paginação de cada superfície da piscina e um "Total" com a soma das
+    peças, cortes e sobras e a perda média ponderada.
+    """
+    resultado = {
+        nome: paginar_superficie(l, a, peca_largura, peca_altura, junta)
+        for nome, l, a in superficies_revestidas(largura, comprimento, profundidade_min, profundidade_max)
+    }
+    total = {k: sum(r[k] for r in resultado.values())
+             for k in ("inteiras", "cortes", "pecas", "sobras_reaproveitaveis")}
+    area_pecas = total["pecas"] * peca_largura * peca_altura
+    perdida = sum(r["perda_pct"] / 100 * r["pecas"] * peca_largura * peca_altura for r in resultado.values())
+    total["perda_pct"] = 100 * perdida / area_pecas if area_pecas else 0.0
+    resultado["Total"] = total
+    return resultado
+
+
+def paginar_projeto(dados_piscina: Dict) -> Optional[Dict[str, Dict]]:
+    """
+    paginar_piscina a partir do dict de coletar_dados_projeto. Retorna None
+    quando o projeto não usa revestimento ou não informou o tamanho da peça.
+    """
+    if dados_piscina.get("Usar_revestimento") != "Revestimento":
+        return None
+    peca_largura = dados_piscina.get("Revestimento_largura_peca")
+    peca_altura = dados_piscina.get("Revestimento_altura_peca")
+    if not peca_largura or not peca_altura:
+        return None
+    return paginar_piscina(
+        dados_piscina["Largura"], dados_piscina["Comprimento"],
+        dados_piscina["Profundidade_min"], dados_piscina["Profundidade_max"],
+        peca_largura, peca_altura
+    )
@@ -0,0 +1,174 @@
+# saidas.py
+"""
+Pastas de saída por trabalho.
+
+Cada geração de relatórios (um orçamento ou um lote) recebe a sua pasta
+dentro de uma raiz configurável (variável de ambiente PISCINA_SAIDAS ou o
+argumento `raiz`). O nome da pasta é criado de forma atômica (mkdtemp):
+threads e processos diferentes nunca escrevem no mesmo lugar, mesmo que
+gerem arquivos com o mesmo nome.
+
+Os arquivos são gravados num temporário da própria pasta e renomeados no
+fim (os.replace é atômico): quem lê ou baixa um relatório nunca o vê pela
+metade. Pastas de trabalho antigas são removidas por limpar_trabalhos, que
+pode rodar sozinho numa thread (agendar_limpeza).
+"""
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+RAIZ_PADRAO = os.environ.get("PISCINA_SAIDAS", "relatorios")
+PREFIXO = "trabalho_"  # só pastas com este prefixo são apagadas na limpeza
+
+
+def _ler_umask() -> int:
+    # os.umask só lê trocando o valor; lido uma vez, na importação
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+
+# mkstemp e mkdtemp criam 0600/0700; o que é publicado volta às permissões
+# de um arquivo comum (ex.: 0644 com umask 022), legível pelo servidor web
+_UMASK = _ler_umask()
+PERMISSAO_ARQUIVO = 0o666 & ~_UMASK
+PERMISSAO_PASTA = 0o777 & ~_UMASK
+
+
+# =======================
+# GRAVAÇÃO ATÔMICA
+# =======================
+
+@contextmanager
+def gravando(caminho: str) -> Iterator[str]:
+    """
+    Entrega um caminho temporário na pasta de `caminho`, com a mesma
+    extensão (pandas e openpyxl escolhem o formato por ela). Se o bloco
+    terminar sem erro o temporário vira `caminho`; senão é apagado.
+    """
+    pasta, nome = os.path.split(os.path.abspath(caminho))
+    fd, temporario = tempfile.mkstemp(dir=pasta, prefix=f".{nome}.", suffix=os.path.splitext(nome)[1])
+    os.close(fd)
+    try:
+        yield temporario
+        os.chmod(temporario, PERMISSAO_ARQUIVO)
+        os.replace(temporario, caminho)
+    except BaseException:
+        try:
+            os.unlink(temporario)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def gravar_atomico(caminho: str, escrever) -> str:
+    """Chama `escrever(f)` com o arquivo binário temporário e publica o resultado em `caminho`."""
+    with gravando(caminho) as temporario:
+        with open(temporario, "wb") as f:
+            escrever(f)
+    return caminho
+
+
+# =======================
+# TRABALHOS
+# =======================
+
+class Trabalho:
+    """A pasta exclusiva de um trabalho; `id` é o nome da pasta."""
+
+    __slots__ = ("pasta", "id")
+
+    def __init__(self, pasta: str):
+        self.pasta = os.path.abspath(pasta)
+        self.id = os.path.basename(self.pasta)
+
+    def caminho(self, nome: str) -> str:
+        return os.path.join(self.pasta, nome)
+
+    def gravando(self, nome: str):
+        """gravando() para o arquivo `nome` da pasta do trabalho."""
+        return gravando(self.caminho(nome))
+
+    def gravar(self, nome: str, dados: bytes) -> str:
+        return gravar_atomico(self.caminho(nome), lambda f: f.write(dados))
+
+    def arquivos(self) -> List[str]:
+        """Arquivos já publicados (sem os temporários em andamento)."""
+        return sorted(self.caminho(n) for n in os.listdir(self.pasta) if not n.startswith("."))
+
+    def remover(self):
+        shutil.rmtree(self.pasta, ignore_errors=True)
+
+    def __repr__(self) -> str:
+        return f"Trabalho({self.pasta!r})"
+
+
+def abrir_trabalho(raiz: Optional[str] = None, nome: str = "") -> Trabalho:
+    """
+    Cria a pasta de um novo trabalho em `raiz` (padrão: RAIZ_PADRAO):
+    trabalho_<data-hora>_<nome>_<sufixo aleatório>.
+    """
+    raiz = raiz or RAIZ_PADRAO
+    os.makedirs(raiz, exist_ok=True)
+    prefixo = PREFIXO + time.strftime("%Y%m%d-%H%M%S") + (f"_{nome}" if nome else "") + "_"
+    pasta = tempfile.mkdtemp(prefix=prefixo, dir=raiz)
+    os.chmod(pasta, PERMISSAO_PASTA)
+    return Trabalho(pasta)
+
+
+# =======================
+# LIMPEZA
+# =======================
+
+def limpar_trabalhos(raiz: Optional[str] = None, idade_max_h: float = 24.0) -> int:
+    """
+    Apaga as pastas de trabalho de `raiz` sem alteração há mais de
+    `idade_max_h` horas e devolve quantas foram apagadas. Pode rodar em
+    paralelo com outros processos: pastas que somem no meio são ignoradas.
+    """
+    raiz = raiz or RAIZ_PADRAO
+    limite = time.time() - idade_max_h * 3600
+    apagadas = 0
+    try:
+        entradas = list(os.scandir(raiz))
+    except FileNotFoundError:
+        return 0
+    for entrada in entradas:
+        if not entrada.name.startswith(PREFIXO):
+            continue
+        try:
+            # criar ou renomear um arquivo atualiza o mtime da pasta
+            if not entrada.is_dir(follow_symlinks=False) or entrada.stat().st_mtime >= limite:
+                continue
+        except FileNotFoundError:
+            continue
+        shutil.rmtree(entrada.path, ignore_errors=True)
+        apagadas += not os.path.exists(entrada.path)
+    return apagadas
+
+
+def agendar_limpeza(
+    raiz: Optional[str] = None,
+    intervalo_h: float = 1.0,
+    idade_max_h: float = 24.0
+) -> threading.Event:
+    """
+    Roda limpar_trabalhos a cada `intervalo_h` horas numa thread daemon.
+    Devolve um Event: event.set() encerra a limpeza.
+    """
+    parar = threading.Event()
+
+    def laco():
+        while not parar.is_set():
+            try:
+                limpar_trabalhos(raiz, idade_max_h)
+            except OSError:
+                pass  # a raiz pode estar indisponível; tenta de novo no próximo ciclo
+            parar.wait(intervalo_h * 3600)
+
+    threading.Thread(target=laco, name="limpeza-saidas", daemon=True).start()
+    return parar
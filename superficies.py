@@ -0,0 +1,87 @@
+# superficies.py
+"""
+Modelo de superfícies de uma piscina retangular com perfil de fundo.
+
+O perfil é a profundidade ao longo do comprimento, linear por trechos:
+`posicoes` (fração do comprimento, de 0 a 1, não decrescente) e
+`profundidades` (m) em cada posição. Duas posições iguais seguidas formam
+um degrau vertical. A profundidade não varia ao longo da largura.
+
+Perfis de um lote são arrays (piscinas x pontos); perfis com menos pontos
+são completados repetindo o último ponto (trechos de comprimento zero).
+"""
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+
+Perfil = Tuple[np.ndarray, np.ndarray]  # (posicoes, profundidades)
+
+
+def perfil_plano(profundidade: float) -> Perfil:
+    return np.array([0.0, 1.0]), np.array([profundidade, profundidade], dtype=float)
+
+
+def perfil_rampa(profundidade_min: float, profundidade_max: float) -> Perfil:
+    """Fundo inclinado em linha reta da parede rasa até a parede funda."""
+    return np.array([0.0, 1.0]), np.array([profundidade_min, profundidade_max], dtype=float)
+
+
+def perfil_degraus(profundidades: Sequence[float], inicios: Sequence[float]) -> Perfil:
+    """
+    Fundo em patamares: o patamar i tem profundidade profundidades[i] e começa
+    em inicios[i] (fração do comprimento; inicios[0] deve ser 0).
+    """
+    profundidades = np.asarray(profundidades, dtype=float)
+    inicios = np.asarray(inicios, dtype=float)
+    fins = np.append(inicios[1:], 1.0)
+    return np.column_stack([inicios, fins]).ravel(), np.repeat(profundidades, 2)
+
+
+def empilhar_perfis(perfis: Sequence[Perfil]) -> Perfil:
+    """Junta perfis com números de pontos diferentes em dois arrays piscinas x pontos."""
+    k = max(len(p[0]) for p in perfis)
+    posicoes = np.empty((len(perfis), k))
+    profundidades = np.empty((len(perfis), k))
+    for i, (pos, prof) in enumerate(perfis):
+        posicoes[i] = np.pad(pos, (0, k - len(pos)), mode="edge")
+        profundidades[i] = np.pad(prof, (0, k - len(prof)), mode="edge")
+    return posicoes, profundidades
+
+
+def calcular_superficies(largura, comprimento, posicoes, profundidades) -> Dict[str, np.ndarray]:
+    """
+    Superfícies (m²) e volume (m³) de cada piscina do lote:
+
+    - "fundo": área real do fundo, medindo a hipotenusa dos trechos inclinados
+      e os espelhos dos degraus;
+    - "parede_lateral": cada uma das duas paredes do comprimento (trapézios
+      sob o perfil);
+    - "parede_rasa" / "parede_funda": paredes das pontas (posição 0 e 1);
+    - "paredes": soma das quatro paredes; "molhada": fundo + paredes;
+    - "volume": integral exata do perfil vezes a largura;
+    - "altura_quinas": soma das alturas das quatro quinas verticais.
+    """
+    largura = np.atleast_1d(np.asarray(largura, dtype=float))
+    comprimento = np.atleast_1d(np.asarray(comprimento, dtype=float))
+    posicoes = np.atleast_2d(np.asarray(posicoes, dtype=float))
+    profundidades = np.atleast_2d(np.asarray(profundidades, dtype=float))
+
+    dx = np.diff(posicoes, axis=1) * comprimento[:, None]
+    dz = np.diff(profundidades, axis=1)
+    secao = ((profundidades[:, 1:] + profundidades[:, :-1]) / 2 * dx).sum(axis=1)  # m², perfil lateral
+    desenvolvido = np.hypot(dx, dz).sum(axis=1)  # comprimento do fundo medido sobre o perfil
+
+    fundo = largura * desenvolvido
+    rasa = largura * profundidades[:, 0]
+    funda = largura * profundidades[:, -1]
+    paredes = 2 * secao + rasa + funda
+    return {
+        "fundo": fundo,
+        "parede_lateral": secao,
+        "parede_rasa": rasa,
+        "parede_funda": funda,
+        "paredes": paredes,
+        "molhada": fundo + paredes,
+        "volume": largura * secao,
+        "altura_quinas": 2 * (profundidades[:, 0] + profundidades[:, -1]),
+    }
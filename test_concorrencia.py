@@ -0,0 +1,58 @@
+# test_concorrencia.py
+"""
+Geração de relatórios em várias threads: cada orçamento tem que sair igual
+ao gerado sozinho, em sequência.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from reportlab import rl_config
+
+from calculos import calcular_tudo
+from catalogo import abrir_catalogo
+from saidas import abrir_trabalho
+from utils import DPI_PREVIA, gerar_graficos, gerar_pdf
+
+THREADS = 6
+
+
+@pytest.fixture(scope="module")
+def orcamentos():
+    catalogo = abrir_catalogo()
+    return [
+        ({"Nome_projeto": f"Projeto {i}", "Observacoes": "obra " * (30 * i)},
+         calcular_tudo(2 + i % 6, 4 + i % 5, 1.0, 1.2 + 0.1 * (i % 4), i % 2 == 0, i % 3 == 0,
+                       catalogo.custo_unitario, catalogo.extras))
+        for i in range(12)
+    ]
+
+
+def _em_threads(funcao, itens):
+    with ThreadPoolExecutor(THREADS) as pool:
+        return list(pool.map(funcao, itens))
+
+
+def test_graficos_em_threads(orcamentos):
+    def pngs(orcamento):
+        return {nome: b.getvalue() for nome, b in gerar_graficos(orcamento[1], DPI_PREVIA).items()}
+
+    sequencial = [pngs(o) for o in orcamentos]
+    assert _em_threads(pngs, orcamentos) == sequencial
+
+
+def test_pdfs_em_threads(orcamentos, tmp_path, monkeypatch):
+    # invariant: sem data e id aleatório no PDF, para comparar os bytes
+    monkeypatch.setattr(rl_config, "invariant", 1)
+
+    def pdf(orcamento, pasta):
+        dados, resultado = orcamento
+        caminho = gerar_pdf(dados, resultado, graficos=gerar_graficos(resultado, DPI_PREVIA),
+                            trabalho=abrir_trabalho(str(tmp_path / pasta)))
+        with open(caminho, "rb") as f:
+            return caminho, f.read()
+
+    sequencial = [pdf(o, "sequencial") for o in orcamentos]
+    paralelo = _em_threads(lambda o: pdf(o, "threads"), orcamentos)
+    assert [conteudo for _, conteudo in paralelo] == [conteudo for _, conteudo in sequencial]
+    # mesmo nome de arquivo, mas cada orçamento na sua pasta de trabalho
+    assert len({caminho for caminho, _ in paralelo}) == len(orcamentos)
@@ -1,90 +1,380 @@
 # utils.py
-import os
+import copy
+import hashlib
+import io
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table
+from reportlab.platypus import BaseDocTemplate, Frame, PageTemplate, Paragraph, Spacer, Image, Table
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
+from reportlab.graphics.shapes import Drawing
+from openpyxl import Workbook
+from openpyxl.drawing.image import Image as XLImage
+
+from calculos import FASES, NOMES, ROTULOS, UNIDADES, ResultadoOrcamento
+from graficos_vetoriais import gerar_graficos_vetoriais
+from saidas import Trabalho, abrir_trabalho, gravando
+
+def tabelas_orcamento(resultado: ResultadoOrcamento) -> Dict[str, pd.DataFrame]:
+    """
+    Tabelas de apresentação de um orçamento. É aqui que os vetores por id
+    ganham nome e unidade do REGISTRO_MATERIAIS (uma coluna inteira de cada vez).
+    Custos em centavos são exibidos em reais.
+    """
+    ids = resultado.ids_materiais
+    ids_custos = resultado.ids_custos
+    ids_fases = resultado.ids_fases
+    escala = 100 if resultado.centavos else 1
+    return {
+        "Materiais": pd.DataFrame({
+            "Material": NOMES[ids],
+            "Unidade": UNIDADES[ids],
+            "Quantidade": resultado.quantidades[ids],
+        }),
+        "Custos": pd.DataFrame({
+            "Material": ROTULOS[ids_custos],
+            "Custo (R$)": resultado.custos_materiais[ids_custos] / escala,
+        }),
+        "Custos por Fase": pd.DataFrame({
+            "Fase": np.array(FASES, dtype=object)[ids_fases],
+            "Custo (R$)": resultado.custos_fases[ids_fases] / escala,
+        }),
+    }
+
+# Resolução dos gráficos por saída: prévia na tela ou impressão (PDF/Excel)
+DPI_PREVIA = 100
+DPI_IMPRESSAO = 200
 
-os.makedirs("graficos", exist_ok=True)
-os.makedirs("relatorios", exist_ok=True)
+def figura_png(fig, dpi=DPI_IMPRESSAO) -> io.BytesIO:
+    """PNG de uma figura do matplotlib em memória; a figura é fechada."""
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=dpi)
+    if fig.canvas.manager is not None:  # só figuras criadas pelo pyplot
+        plt.close(fig)
+    buffer.seek(0)
+    return buffer
+
+def gerar_graficos(resultado: ResultadoOrcamento, dpi=DPI_IMPRESSAO) -> Dict[str, io.BytesIO]:
+    """
+    Gráficos do orçamento como PNGs em memória, {nome: BytesIO}, na ordem
+    em que entram nos relatórios. Nada é gravado em disco: cada orçamento
+    leva os seus gráficos.
+
+    As figuras são objetos Figure soltos, fora do pyplot (que desenha numa
+    "figura atual" global): várias threads podem gerar gráficos ao mesmo tempo.
+    """
+    tabelas = tabelas_orcamento(resultado)
+    graficos = {}
 
-def gerar_graficos(materiais, custos, custos_fase, area):
     # Quantidade por m²
-    quant_por_m2 = {m: q / area for m, q in materiais.items()}
-    plt.figure(figsize=(10,6))
-    plt.bar(quant_por_m2.keys(), quant_por_m2.values(), color='cornflowerblue')
-    plt.xticks(rotation=45, ha='right')
-    plt.title("Quantidade de materiais por m²")
-    plt.tight_layout()
-    plt.savefig("graficos/quantidade_por_m2.png")
-    plt.close()
+    materiais = tabelas["Materiais"]
+    fig = Figure(figsize=(10,6))
+    ax = fig.add_subplot()
+    ax.bar(materiais["Material"], materiais["Quantidade"] / resultado.area, color='cornflowerblue')
+    plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+    ax.set_title("Quantidade de materiais por m²")
+    fig.tight_layout()
+    graficos["quantidade_por_m2"] = figura_png(fig, dpi)
 
     # Custo por fase
-    plt.figure(figsize=(8,8))
-    plt.pie(custos_fase.values(), labels=custos_fase.keys(), autopct='%1.1f%%', startangle=90)
-    plt.title("Distribuição de custos por fase")
-    plt.tight_layout()
-    plt.savefig("graficos/custo_por_fase.png")
-    plt.close()
+    fases = tabelas["Custos por Fase"]
+    fig = Figure(figsize=(8,8))
+    ax = fig.add_subplot()
+    ax.pie(fases["Custo (R$)"], labels=fases["Fase"], autopct='%1.1f%%', startangle=90)
+    ax.set_title("Distribuição de custos por fase")
+    fig.tight_layout()
+    graficos["custo_por_fase"] = figura_png(fig, dpi)
 
     # Custo por material
-    sorted_custos = dict(sorted(custos.items(), key=lambda x: x[1], reverse=True))
-    plt.figure(figsize=(12,6))
-    plt.bar(list(sorted_custos.keys())[:10], list(sorted_custos.values())[:10], color='seagreen')
-    plt.xticks(rotation=45, ha='right')
-    plt.title("Top 10 custos por material")
-    plt.tight_layout()
-    plt.savefig("graficos/custo_por_material.png")
-    plt.close()
-
-def salvar_excel(dados_projeto, materiais, custos, custos_fase, nome_arquivo="relatorio_piscina.xlsx"):
-    caminho = os.path.join("relatorios", nome_arquivo)
-    with pd.ExcelWriter(caminho) as writer:
-        pd.DataFrame([dados_projeto]).to_excel(writer, sheet_name="Projeto", index=False)
-        pd.DataFrame(list(materiais.items()), columns=["Material", "Quantidade"]).to_excel(writer, sheet_name="Materiais", index=False)
-        pd.DataFrame(list(custos.items()), columns=["Material", "Custo (R$)"]).to_excel(writer, sheet_name="Custos", index=False)
-        pd.DataFrame(list(custos_fase.items()), columns=["Fase", "Custo (R$)"]).to_excel(writer, sheet_name="Custos por Fase", index=False)
+    top = tabelas["Custos"].nlargest(10, "Custo (R$)")
+    fig = Figure(figsize=(12,6))
+    ax = fig.add_subplot()
+    ax.bar(top["Material"], top["Custo (R$)"], color='seagreen')
+    plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+    ax.set_title("Top 10 custos por material")
+    fig.tight_layout()
+    graficos["custo_por_material"] = figura_png(fig, dpi)
+    return graficos
+
+def adicionar_aba_graficos(wb, graficos: Dict[str, io.BytesIO], largura_px=800):
+    """Aba "Gráficos" com as imagens uma abaixo da outra, com `largura_px` de largura."""
+    aba = wb.create_sheet("Gráficos")
+    linha = 1
+    for buffer in graficos.values():
+        imagem = XLImage(io.BytesIO(buffer.getvalue()))
+        escala = largura_px / imagem.width
+        imagem.width, imagem.height = largura_px, int(imagem.height * escala)
+        aba.add_image(imagem, f"A{linha}")
+        linha += imagem.height // 20 + 2  # linhas de 20 px
+
+def salvar_excel(dados_projeto, resultado: ResultadoOrcamento, nome_arquivo="relatorio_piscina.xlsx",
+                 graficos: Optional[Dict[str, io.BytesIO]] = None, trabalho: Optional[Trabalho] = None):
+    """
+    Grava a planilha na pasta de `trabalho` (sem trabalho, numa pasta nova
+    de saidas.abrir_trabalho) e devolve o caminho.
+    """
+    caminho = (trabalho or abrir_trabalho()).caminho(nome_arquivo)
+    with gravando(caminho) as temporario:
+        with pd.ExcelWriter(temporario) as writer:
+            pd.DataFrame([dados_projeto]).to_excel(writer, sheet_name="Projeto", index=False)
+            for aba, tabela in tabelas_orcamento(resultado).items():
+                tabela.to_excel(writer, sheet_name=aba, index=False)
+            if graficos:
+                adicionar_aba_graficos(writer.book, graficos)
     return caminho
 
-def gerar_pdf(dados_projeto, materiais, custos, custos_fase, caminho_pdf="orcamento_piscina.pdf"):
-    caminho = os.path.join("relatorios", caminho_pdf)
-    doc = SimpleDocTemplate(caminho, pagesize=letter)
-    styles = getSampleStyleSheet()
-    story = []
+def salvar_excel_lote(
+    projetos: Iterable[Tuple[object, Dict, ResultadoOrcamento]],
+    nome_arquivo="relatorio_lote.xlsx",
+    campos: Optional[Sequence[str]] = None,
+    trabalho: Optional[Trabalho] = None
+):
+    """
+    Exporta muitos orçamentos numa planilha só, em formato longo: abas
+    Projeto, Materiais, Custos e Custos por Fase, uma linha por projeto e
+    item, com a coluna "Projeto" como chave.
 
-    styles.add(ParagraphStyle(name='Title', fontSize=16, spaceAfter=12, alignment=1))
-    story.append(Paragraph(f"Orçamento de Piscina – {dados_projeto.get('Nome_projeto', 'Cliente')}", styles['Title']))
+    `projetos` é um iterável de (id_projeto, dados_projeto, resultado) e
+    pode ser um gerador: o Workbook write_only do openpyxl grava as linhas
+    em disco à medida que chegam, então a memória não cresce com o lote.
+    As colunas da aba Projeto são `campos` ou as chaves do primeiro projeto.
+    A planilha vai para a pasta de `trabalho` (padrão: um trabalho novo).
+    """
+    caminho = (trabalho or abrir_trabalho(nome="lote")).caminho(nome_arquivo)
+    wb = Workbook(write_only=True)
+    aba_projeto = wb.create_sheet("Projeto")
+    aba_materiais = wb.create_sheet("Materiais")
+    aba_custos = wb.create_sheet("Custos")
+    aba_fases = wb.create_sheet("Custos por Fase")
+    aba_materiais.append(["Projeto", "Material", "Unidade", "Quantidade"])
+    aba_custos.append(["Projeto", "Material", "Custo (R$)"])
+    aba_fases.append(["Projeto", "Fase", "Custo (R$)"])
+    fases = np.array(FASES, dtype=object)
 
-    def add_section(titulo, dados):
-        story.append(Paragraph(titulo, styles['Heading2']))
-        for k, v in dados.items():
-            story.append(Paragraph(f"{k}: {v}", styles['BodyText']))
-        story.append(Spacer(1, 12))
+    for id_projeto, dados_projeto, resultado in projetos:
+        if campos is None:
+            campos = list(dados_projeto)
+            aba_projeto.append(["Projeto", *campos])
+        aba_projeto.append([id_projeto, *(dados_projeto.get(c) for c in campos)])
 
-    add_section("Dados do Projeto", dados_projeto)
-    add_section("Materiais", {k: f"{v:.2f}" for k, v in materiais.items()})
-    add_section("Custos por Material (R$)", {k: f"R$ {v:.2f}" for k, v in custos.items()})
-    add_section("Custos por Fase (R$)", {k: f"R$ {v:.2f}" for k, v in custos_fase.items()})
+        escala = 100 if resultado.centavos else 1
+        ids = resultado.ids_materiais
+        for nome, unidade, q in zip(NOMES[ids], UNIDADES[ids], resultado.quantidades[ids].tolist()):
+            aba_materiais.append([id_projeto, nome, unidade, q])
+        ids = resultado.ids_custos
+        for rotulo, custo in zip(ROTULOS[ids], (resultado.custos_materiais[ids] / escala).tolist()):
+            aba_custos.append([id_projeto, rotulo, custo])
+        ids = resultado.ids_fases
+        for fase, custo in zip(fases[ids], (resultado.custos_fases[ids] / escala).tolist()):
+            aba_fases.append([id_projeto, fase, custo])
 
-    # Gráficos
-    for img in ["quantidade_por_m2.png", "custo_por_fase.png", "custo_por_material.png"]:
-        img_path = os.path.join("graficos", img)
-        if os.path.exists(img_path):
-            story.append(Spacer(1, 12))
-            story.append(Image(img_path, width=6*inch, height=4*inch))
+    with gravando(caminho) as temporario:
+        wb.save(temporario)
+    return caminho
+
+class RenderizadorRelatorio:
+    """
+    Gerador de PDFs de orçamento de vida longa: estilos, modelo de página e
+    a seção fixa "Etapas do Projeto" são montados uma vez no construtor, e
+    cada orçamento só acrescenta o título, as tabelas e os gráficos.
 
-    story.append(Spacer(1, 20))
-    story.append(Paragraph("Etapas do Projeto", styles['Heading2']))
-    story.append(Paragraph("""
+    Os flowables fixos ficam como modelos já interpretados e cada documento
+    recebe cópias rasas deles: o platypus marca nos flowables o estado da
+    paginação (ex.: _postponed), que não pode vazar de um PDF para outro.
+    Pelo mesmo motivo o quadro e o modelo de página, que guardam o cursor
+    da paginação, são criados a cada documento. Assim uma instância pode
+    renderizar em várias threads ao mesmo tempo: o estado compartilhado
+    (estilos e modelos) só é lido.
+    """
+
+    def __init__(self, pagesize=letter):
+        self.pagesize = pagesize
+        self.styles = getSampleStyleSheet()
+        self.styles.add(ParagraphStyle(name='TituloOrcamento', fontSize=16, spaceAfter=12, alignment=1))
+        self._titulo_secao = self.styles['Heading2']
+        self._texto = self.styles['BodyText']
+
+        self._etapas = [
+            Spacer(1, 20),
+            Paragraph("Etapas do Projeto", self._titulo_secao),
+            Paragraph("""
     1. Alvenaria: estrutura com blocos.
     2. Impermeabilização: proteção contra vazamentos.
     3. Chapisco/Reboco: acabamento base.
     4. Revestimento: estética e funcionalidade.
     5. Acabamento: rejunte e acessórios.
     6. Extras: hidromassagem (se aplicável).
-    """, styles['BodyText']))
+    """, self._texto),
+        ]
+
+    def _paginas(self) -> List[PageTemplate]:
+        # Modelo de página: o mesmo quadro e margens do SimpleDocTemplate
+        largura, altura = self.pagesize
+        quadro = Frame(inch, inch, largura - 2 * inch, altura - 2 * inch, id='normal')
+        return [PageTemplate(id='Orcamento', frames=[quadro])]
+
+    def _secao(self, story, titulo, linhas):
+        story.append(Paragraph(titulo, self._titulo_secao))
+        for k, v in linhas:
+            story.append(Paragraph(f"{k}: {v}", self._texto))
+        story.append(Spacer(1, 12))
+
+    def renderizar(self, dados_projeto, resultado: ResultadoOrcamento, destino,
+                   graficos: Optional[Dict[str, object]] = None):
+        """
+        Renderiza um orçamento em `destino` (caminho ou arquivo binário, ex.:
+        BytesIO para responder direto numa requisição) e devolve `destino`.
+        `graficos` são os PNGs em memória de gerar_graficos ou os Drawings
+        de graficos_vetoriais.gerar_graficos_vetoriais.
+        """
+        story = [Paragraph(f"Orçamento de Piscina – {dados_projeto.get('Nome_projeto', 'Cliente')}",
+                           self.styles['TituloOrcamento'])]
+
+        escala = 100 if resultado.centavos else 1
+        ids = resultado.ids_materiais
+        quantidades = (f"{q:.2f} {u}".rstrip() for q, u in zip(resultado.quantidades[ids].tolist(), UNIDADES[ids]))
+        ids_custos = resultado.ids_custos
+        custos = (f"R$ {v:.2f}" for v in (resultado.custos_materiais[ids_custos] / escala).tolist())
+        ids_fases = resultado.ids_fases
+        fases = (f"R$ {v:.2f}" for v in (resultado.custos_fases[ids_fases] / escala).tolist())
+        self._secao(story, "Dados do Projeto", dados_projeto.items())
+        self._secao(story, "Materiais", zip(NOMES[ids], quantidades))
+        self._secao(story, "Custos por Material (R$)", zip(ROTULOS[ids_custos], custos))
+        self._secao(story, "Custos por Fase (R$)", zip((FASES[j] for j in ids_fases), fases))
+
+        # Gráficos
+        for grafico in (graficos or {}).values():
+            story.append(Spacer(1, 12))
+            if isinstance(grafico, Drawing):
+                story.append(copy.copy(grafico))
+            else:
+                story.append(Image(io.BytesIO(grafico.getvalue()), width=6*inch, height=4*inch))
+
+        story.extend(copy.copy(f) for f in self._etapas)
+        doc = BaseDocTemplate(destino, pagesize=self.pagesize, pageTemplates=self._paginas())
+        doc.build(story)
+        return destino
+
+_RENDERIZADOR: Optional[RenderizadorRelatorio] = None
+
+def renderizador_padrao() -> RenderizadorRelatorio:
+    """Renderizador compartilhado do processo, criado na primeira chamada."""
+    global _RENDERIZADOR
+    if _RENDERIZADOR is None:
+        _RENDERIZADOR = RenderizadorRelatorio()
+    return _RENDERIZADOR
+
+def gerar_pdf(dados_projeto, resultado: ResultadoOrcamento, caminho_pdf="orcamento_piscina.pdf",
+              graficos: Optional[Dict[str, object]] = None, trabalho: Optional[Trabalho] = None):
+    """
+    Grava o PDF na pasta de `trabalho` (sem trabalho, numa pasta nova de
+    saidas.abrir_trabalho) e devolve o caminho.
+    """
+    caminho = (trabalho or abrir_trabalho()).caminho(caminho_pdf)
+    with gravando(caminho) as temporario:
+        renderizador_padrao().renderizar(dados_projeto, resultado, temporario, graficos)
+    return caminho
+
+
+# =======================
+# PDFs EM LOTE
+# =======================
+
+def _nome_pdf(id_projeto) -> str:
+    # Ids com caracteres trocados por "_" levam um hash do id original, para
+    # "p/1" não cair no mesmo arquivo que "p_1"
+    texto = str(id_projeto)
+    nome = re.sub(r"[^\w.-]+", "_", texto)
+    if nome != texto:
+        nome += "_" + hashlib.sha1(texto.encode("utf-8")).hexdigest()[:8]
+    return "orcamento_" + nome + ".pdf"
+
+def _gerar_bloco_pdf(bloco, pasta, graficos, vetorial, dpi):
+    # Roda no processo trabalhador: reportlab e matplotlib já foram
+    # importados junto com este módulo, uma vez por processo. Os gráficos de
+    # cada projeto ficam em memória, sem arquivos compartilhados.
+    trabalho = Trabalho(pasta)
+    saida = []
+    for id_projeto, dados_projeto, resultado in bloco:
+        try:
+            if not graficos:
+                desenhos = None
+            elif vetorial:
+                desenhos = gerar_graficos_vetoriais(resultado)
+            else:
+                desenhos = gerar_graficos(resultado, dpi)
+            caminho = gerar_pdf(dados_projeto, resultado, _nome_pdf(id_projeto), desenhos, trabalho)
+            saida.append((id_projeto, caminho, None))
+        except Exception as e:
+            saida.append((id_projeto, None, f"{type(e).__name__}: {e}"))
+    return saida
+
+def gerar_pdfs_lote(
+    projetos: Iterable[Tuple[object, Dict, ResultadoOrcamento]],
+    trabalho: Optional[Trabalho] = None,
+    processos: Optional[int] = None,
+    tamanho_bloco: int = 20,
+    graficos: bool = True,
+    vetorial: bool = False,
+    dpi=DPI_IMPRESSAO,
+    progresso: Optional[Callable[[int, int], None]] = None
+) -> Dict[str, Dict]:
+    """
+    Gera um PDF por projeto (orcamento_<id>.pdf na pasta de `trabalho`,
+    padrão: um trabalho novo de saidas.abrir_trabalho) distribuindo os
+    projetos em blocos de `tamanho_bloco` por um pool de `processos`
+    processos (padrão: um por núcleo).
 
-    doc.build(story)
-    return caminho
\ No newline at end of file
+    `projetos` é um iterável de (id_projeto, dados_projeto, resultado).
+    Com `vetorial=True` os gráficos são os Drawings do reportlab
+    (graficos_vetoriais), bem mais rápidos e leves que os PNGs.
+    `progresso(feitos, total)` é chamado a cada bloco concluído. Um projeto
+    que falha não interrompe o lote: o erro fica em "falhas".
+    Um id repetido no lote não é gerado (não dá para saber qual dos
+    projetos vale) e ids que dariam o mesmo arquivo (ex.: 1 e "1") só geram
+    o primeiro: os demais vão para "falhas". Um id nunca aparece nos dois.
+    Retorna {"gerados": {id: caminho}, "falhas": {id: mensagem}}.
+    """
+    pasta = (trabalho or abrir_trabalho(nome="lote")).pasta
+    projetos = list(projetos)
+    posicoes: Dict[object, List[int]] = {}
+    for i, projeto in enumerate(projetos):
+        posicoes.setdefault(projeto[0], []).append(i)
+    gerados, falhas = {}, {}
+    unicos, nomes = [], {}
+    for id_projeto, lista in posicoes.items():
+        nome = _nome_pdf(id_projeto)
+        if len(lista) > 1:
+            falhas[id_projeto] = f"Id repetido no lote (posições {lista})"
+        elif nome in nomes:
+            falhas[id_projeto] = f"Arquivo {nome} já usado pelo projeto {nomes[nome]!r}"
+        else:
+            nomes[nome] = id_projeto
+            unicos.append(projetos[lista[0]])
+    total, feitos = len(projetos), len(projetos) - len(unicos)
+    if feitos and progresso is not None:
+        progresso(feitos, total)
+    blocos: List[list] = [unicos[i:i + tamanho_bloco] for i in range(0, len(unicos), tamanho_bloco)]
+    with ProcessPoolExecutor(max_workers=processos) as pool:
+        tarefas = {pool.submit(_gerar_bloco_pdf, bloco, pasta, graficos, vetorial, dpi): bloco for bloco in blocos}
+        for tarefa in as_completed(tarefas):
+            try:
+                saida = tarefa.result()
+            except Exception as e:  # o processo do bloco morreu
+                saida = [(p[0], None, f"{type(e).__name__}: {e}") for p in tarefas[tarefa]]
+            for id_projeto, caminho, erro in saida:
+                if erro is None:
+                    gerados[id_projeto] = caminho
+                else:
+                    falhas[id_projeto] = erro
+            feitos += len(saida)
+            if progresso is not None:
+                progresso(feitos, total)
+    return {"gerados": gerados, "falhas": falhas}
@@ -0,0 +1,113 @@
+# varredura.py
+from typing import Dict, Iterator, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from calculos import calcular_lote
+
+# Uma faixa pode ser dada como (inicio, fim, passo) ou como a lista de valores
+Faixa = Union[tuple, Sequence[float], np.ndarray]
+
+
+def faixa(inicio: float, fim: float, passo: float) -> np.ndarray:
+    """
+    Valores de inicio até fim (inclusive) com o passo dado, sem acumular o erro
+    de ponto flutuante de somas repetidas (ex.: 1.0, 1.1, ..., 2.2).
+    """
+    n = int(round((fim - inicio) / passo)) + 1
+    return np.round(inicio + passo * np.arange(n), 10)
+
+
+def _valores(f: Faixa) -> np.ndarray:
+    if isinstance(f, tuple) and len(f) == 3:
+        return faixa(*f)
+    return np.asarray(f)
+
+
+def iterar_varredura(
+    larguras: Faixa,
+    comprimentos: Faixa,
+    profundidades_min: Faixa,
+    custo_unitario: Dict[str, float],
+    extras: Dict[str, float],
+    profundidades_max: Optional[Faixa] = None,
+    revestimento: Sequence[bool] = (True,),
+    hidromassagem: Sequence[bool] = (False,),
+    tamanho_bloco: int = 200_000,
+    incluir_materiais: bool = False
+) -> Iterator[pd.DataFrame]:
+    """
+    Percorre a grade completa de combinações em blocos de até `tamanho_bloco`
+    linhas, gerando um DataFrame por bloco. Só um bloco fica em memória por vez.
+
+    Sem `profundidades_max` o fundo é plano (profundidade_max = profundidade_min).
+    Combinações com profundidade_max < profundidade_min são descartadas.
+    """
+    eixos = {
+        "largura": _valores(larguras),
+        "comprimento": _valores(comprimentos),
+        "profundidade_min": _valores(profundidades_min),
+    }
+    if profundidades_max is not None:
+        eixos["profundidade_max"] = _valores(profundidades_max)
+    eixos["revestimento"] = np.asarray(revestimento, dtype=bool)
+    eixos["hidromassagem"] = np.asarray(hidromassagem, dtype=bool)
+
+    forma = tuple(len(v) for v in eixos.values())
+    total = int(np.prod(forma))
+
+    for inicio in range(0, total, tamanho_bloco):
+        indices = np.unravel_index(np.arange(inicio, min(inicio + tamanho_bloco, total)), forma)
+        dados = {nome: valores[i] for (nome, valores), i in zip(eixos.items(), indices)}
+        if profundidades_max is None:
+            dados["profundidade_max"] = dados["profundidade_min"]
+        else:
+            validos = dados["profundidade_max"] >= dados["profundidade_min"]
+            if not validos.all():
+                dados = {nome: coluna[validos] for nome, coluna in dados.items()}
+            if not len(dados["largura"]):
+                continue
+
+        materiais, custos, custos_fase, area = calcular_lote(dados, custo_unitario, extras)
+
+        colunas = {nome: dados[nome] for nome in
+                   ("largura", "comprimento", "profundidade_min", "profundidade_max",
+                    "revestimento", "hidromassagem")}
+        colunas["area"] = area
+        if incluir_materiais:
+            colunas.update(materiais)
+            colunas.update({f"Custo {mat} (R$)": v for mat, v in custos.items()})
+        colunas.update({f"{fase} (R$)": v for fase, v in custos_fase.items()})
+        colunas["Total (R$)"] = np.sum(list(custos.values()), axis=0)
+        yield pd.DataFrame(colunas)
+
+
+def varrer_custos(
+    caminho: str,
+    larguras: Faixa,
+    comprimentos: Faixa,
+    profundidades_min: Faixa,
+    custo_unitario: Dict[str, float],
+    extras: Dict[str, float],
+    **opcoes
+) -> int:
+    """
+    Grava a superfície de custos da grade em CSV, bloco a bloco, e retorna o
+    número de linhas escritas. Aceita as mesmas opções de iterar_varredura.
+
+    Exemplo: larguras 2–8 m × comprimentos 4–15 m × profundidades 1,0–2,2 m, passo 0,1:
+        varrer_custos("tabela.csv", (2, 8, 0.1), (4, 15, 0.1), (1.0, 2.2, 0.1), custo_unitario, extras)
+    """
+    linhas = 0
+    with open(caminho, "w", newline="") as f:
+        for bloco in iterar_varredura(larguras, comprimentos, profundidades_min, custo_unitario, extras, **opcoes):
+            bloco.to_csv(f, header=linhas == 0, index=False)
+            linhas += len(bloco)
+        if linhas == 0:
+            # Nenhuma combinação válida: grava só o cabeçalho (tirado de uma
+            # piscina qualquer), para não sobrar o CSV de uma execução anterior
+            modelo = next(iterar_varredura([1.0], [1.0], [1.0], custo_unitario, extras,
+                                           incluir_materiais=opcoes.get("incluir_materiais", False)))
+            modelo.iloc[:0].to_csv(f, index=False)
+    return linhas